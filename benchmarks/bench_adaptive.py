@@ -0,0 +1,63 @@
+# Benchmark AdaptiveFixer against fix_json on streams from sources which always break their
+# documents in the same way.
+#
+#   python -m benchmarks.bench_adaptive
+import json
+import random
+import timeit
+
+from json_fixer import AdaptiveFixer, JSONFixError, fix_json
+
+
+def generate_documents(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        documents.append({
+            'id': index,
+            'user': {'name': f'user {index}', 'email': f'user{index}@example.com'},
+            'score': round(rng.random(), 4),
+            'active': rng.random() < 0.5,
+            'tags': ['a', 'b', 'c'][:rng.randint(0, 3)],
+        })
+    return documents
+
+
+def generate_sources(count: int):
+    rng = random.Random(2)
+    documents = generate_documents(count)
+    valid = [json.dumps(document) for document in documents]
+    return {
+        'valid': valid,
+        'truncated': [text[:rng.randint(len(text) // 2, len(text) - 1)] for text in valid],
+        'python_literal': [repr(document) for document in documents],
+        'full': ["{id: %d, /* generated */ name: 'user %d'}" % (index, index) for index in range(count)],
+    }
+
+
+def repair(function, text: str, *args):
+    try:
+        return function(text, *args)
+    except JSONFixError:
+        return None
+
+
+def report(name: str, seconds: float, count: int):
+    print(f'{name:<40} {seconds * 1000:8.2f} ms  {count / seconds:10.0f} documents/s')
+
+
+def main():
+    repeat = 5
+    for source, texts in generate_sources(5_000).items():
+        fixer = AdaptiveFixer()
+        for text in texts:
+            repair(fixer.fix, text, source)
+        print(f'{source} source, strategy {fixer.strategy(source)}')
+        seconds = min(timeit.repeat(lambda: [repair(fix_json, text) for text in texts], number=1, repeat=repeat))
+        report('fix_json', seconds, len(texts))
+        seconds = min(timeit.repeat(lambda: [repair(fixer.fix, text, source) for text in texts], number=1, repeat=repeat))
+        report('AdaptiveFixer', seconds, len(texts))
+
+
+if __name__ == '__main__':
+    main()
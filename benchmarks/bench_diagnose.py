@@ -0,0 +1,53 @@
+# Benchmark diagnose against a full repair with fix_json, on streams of messages of which most
+# or all are valid JSON, and on streams of invalid messages only, with short strings or with a
+# long text like the content of a chat message.
+#
+#   python -m benchmarks.bench_diagnose
+import json
+import random
+import timeit
+
+from json_fixer import JSONFixError, diagnose, fix_json
+
+
+def generate_messages(count: int, invalid_ratio: float, content_length: int = 0, seed: int = 1):
+    rng = random.Random(seed)
+    messages = []
+    for index in range(count):
+        message = json.dumps({
+            'id': index,
+            'user': {'name': f'user {index}', 'email': f'user{index}@example.com'},
+            'score': round(rng.random(), 4),
+            'tags': ['a', 'b', 'c'][:rng.randint(0, 3)],
+            'content': ('Some words of a message. ' * (content_length // 25 + 1))[:content_length],
+        })
+        if rng.random() < invalid_ratio:
+            # a truncated message
+            message = message[:rng.randint(1, len(message) - 1)]
+        messages.append(message)
+    return messages
+
+
+def repair(message: str):
+    try:
+        return fix_json(message)
+    except JSONFixError:
+        return None
+
+
+def report(name: str, seconds: float, count: int):
+    print(f'{name:<40} {seconds * 1000:8.2f} ms  {count / seconds:10.0f} messages/s')
+
+
+def main():
+    repeat = 5
+    for invalid_ratio, content_length in [(0.0, 0), (0.05, 0), (1.0, 0), (1.0, 500)]:
+        messages = generate_messages(10_000, invalid_ratio, content_length)
+        print(f'{invalid_ratio:.0%} invalid messages, content of {content_length} characters')
+        for name, function in [('fix_json', repair), ('diagnose', diagnose)]:
+            seconds = min(timeit.repeat(lambda: [function(message) for message in messages], number=1, repeat=repeat))
+            report(name, seconds, len(messages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Benchmark fix_json_extract against a full repair with fix_json, on a large truncated
+# chat completion response of which only the tool calls of the first choice are needed.
+#
+#   python -m benchmarks.bench_extract
+import json
+import random
+import timeit
+
+from json_fixer import fix_json, fix_json_extract
+
+PATHS = ['$.id', '$.choices[0].message.tool_calls']
+
+
+def generate_response(choices: int, seed: int = 1):
+    rng = random.Random(seed)
+    response = {
+        'id': 'resp-1',
+        'object': 'chat.completion',
+        'choices': [{
+            'index': index,
+            'message': {
+                'role': 'assistant',
+                'content': ' '.join(rng.choice(['lorem', 'ipsum', '{dolor}', '[sit]', '"amet"']) for _ in range(200)),
+                'tool_calls': [{'id': f'call-{index}-{call}', 'type': 'function',
+                                'function': {'name': 'lookup', 'arguments': json.dumps({'query': 'x' * 50})}}
+                               for call in range(3)],
+            },
+            'finish_reason': 'tool_calls',
+        } for index in range(choices)],
+    }
+    text = json.dumps(response, indent=2)
+    # truncated in the middle of the last choice
+    return text[:-500]
+
+
+def report(name: str, seconds: float, size: int):
+    print(f'{name:<40} {seconds * 1000:8.2f} ms  {size / seconds / 1e6:8.2f} MB/s')
+
+
+def main():
+    repeat = 5
+    text = generate_response(500)
+    for name, function in [('fix_json', lambda: fix_json(text)),
+                           ('fix_json_extract', lambda: fix_json_extract(text, PATHS))]:
+        seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+        report(name, seconds, len(text))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Benchmark the Python literal fast path against fix_json on repr() output.
+#
+#   python -m benchmarks.bench_literal
+import random
+import timeit
+
+from json_fixer import fix_json, fix_python_literal
+
+
+def generate_records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [{
+        'id': index,
+        'name': f"item {index}'s name",
+        'score': rng.random(),
+        'active': rng.random() < 0.5,
+        'parent': None if index % 3 else index // 3,
+        'tags': ['a', 'b', 'c'][:rng.randint(0, 3)],
+    } for index in range(count)]
+
+
+def report(name: str, seconds: float, size: int):
+    print(f'{name:<50} {seconds * 1000:8.2f} ms  {size / seconds / 1e6:8.2f} MB/s')
+
+
+def main():
+    repeat = 3
+    records = generate_records(20_000)
+    cases = [
+        ('list of dicts', repr(records)),
+        ('list of dicts with tuples', repr([dict(record, tags=tuple(record['tags'])) for record in records])),
+        ('dict with int keys', repr({record['id']: record for record in records})),
+    ]
+    for name, text in cases:
+        for function in [fix_json, fix_python_literal]:
+            try:
+                seconds = min(timeit.repeat(lambda: function(text), number=1, repeat=repeat))
+            except Exception as err:
+                print(f'{function.__name__} ({name}): {type(err).__name__}')
+                continue
+            report(f'{function.__name__} ({name})', seconds, len(text))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Benchmark fix_json with different repair profiles, on input with truncation and trailing
+# comma errors only, which every profile repairs.
+#
+#   python -m benchmarks.bench_profiles
+import json
+import random
+import timeit
+
+from json_fixer import fix_json
+from json_fixer.fixer import REPAIRS
+
+PROFILES = {
+    'all repairs (default)': None,
+    'no repairs': (),
+    'comments, special_quotes': ('comments', 'special_quotes'),
+    'all but special_whitespace': tuple(repair for repair in REPAIRS if repair != 'special_whitespace'),
+    'all but comments': tuple(repair for repair in REPAIRS if repair != 'comments'),
+}
+
+
+def generate_document(count: int, seed: int = 1):
+    # a JSON document with a trailing comma in every record, truncated in the middle of the last one
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        record = json.dumps({
+            'id': index,
+            'name': f'item {index}',
+            'score': round(rng.random(), 4),
+            'active': rng.random() < 0.5,
+            'tags': ['a', 'b', 'c'][:rng.randint(0, 3)],
+        }, indent=2)
+        records.append(record[:-2] + ',\n}')
+    text = '[\n' + ',\n'.join(records) + '\n]'
+    return text[:-len(records[-1]) // 2]
+
+
+def report(name: str, seconds: float, size: int):
+    print(f'{name:<40} {seconds * 1000:8.2f} ms  {size / seconds / 1e6:8.2f} MB/s')
+
+
+def main():
+    repeat = 5
+    text = generate_document(5_000)
+    for name, profile in PROFILES.items():
+        seconds = min(timeit.repeat(lambda: fix_json(text, profile=profile), number=1, repeat=repeat))
+        report(name, seconds, len(text))
+
+
+if __name__ == '__main__':
+    main()
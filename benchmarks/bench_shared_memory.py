@@ -0,0 +1,46 @@
+# Benchmark the cost of moving documents to a worker process and back: SharedMemoryPool
+# against a plain ProcessPoolExecutor, which pickles the text both ways. The worker runs str,
+# which returns the text as it is, so only the transfer is measured.
+#
+#   python -m benchmarks.bench_shared_memory --sizes 1 10 50 200
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from json_fixer.shared import SharedMemoryPool
+
+
+def generate_text(size: int):
+    # a broken document of about size characters, with some non-ASCII text
+    record = "{id: 1, name: 'Zoë', tags: [a, b,], text: \"line\\nline\"},\n"
+    return '[' + record * (size // len(record))
+
+
+def measure(function, repeat: int):
+    # returns the best time of function() in seconds
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the transfer cost of SharedMemoryPool and ProcessPoolExecutor.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50], help='document sizes in MB')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per size, the best one is reported')
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(1) as executor, SharedMemoryPool(workers=1) as pool:
+        executor.submit(str, '').result()
+        for size in args.sizes:
+            text = generate_text(size * 1_000_000)
+            pickled = measure(lambda: executor.submit(str, text).result(), args.repeat)
+            shared = measure(lambda: pool.run(str, text), args.repeat)
+            print(f'{size:5d} MB  ProcessPoolExecutor {pickled * 1000:9.2f} ms  '
+                  f'SharedMemoryPool {shared * 1000:9.2f} ms  {pickled / shared:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Benchmark the throughput of fix_json with 1..N threads in one process. Run it on a standard
+# and a free-threaded (python3.13t or later) interpreter to compare: with the GIL, threads take
+# turns and the throughput stays flat, without it fix_json scales with the number of cores.
+#
+#   python -m benchmarks.bench_threads --threads 8
+import argparse
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from json_fixer import fix_json
+
+
+def generate_documents(count: int):
+    # small broken documents, like the ones of a request handler
+    return [
+        f"{{id: {index}, name: 'item {index}', tags: [a, b,], active: True, /* note */ parent: None, "
+        f'"text": "line\\nline", "values": [1 2 3]'
+        for index in range(count)
+    ]
+
+
+def gil_enabled():
+    # sys._is_gil_enabled exists since Python 3.13
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def measure(documents, threads: int, repeat: int):
+    # returns the best throughput in documents per second
+    best = 0.0
+    with ThreadPoolExecutor(threads) as executor:
+        # warm up the threads
+        list(executor.map(fix_json, documents[:threads]))
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in executor.map(fix_json, documents, chunksize=max(1, len(documents) // (threads * 16))):
+                pass
+            best = max(best, len(documents) / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the thread scaling of fix_json.')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='maximum number of threads')
+    parser.add_argument('--documents', type=int, default=20_000, help='number of documents per run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per thread count, the best one is reported')
+    args = parser.parse_args()
+
+    print(f'{platform.python_implementation()} {platform.python_version()}, '
+          f'GIL {"enabled" if gil_enabled() else "disabled"}, {os.cpu_count()} CPUs')
+    documents = generate_documents(args.documents)
+    baseline = None
+    for threads in range(1, args.threads + 1):
+        throughput = measure(documents, threads, args.repeat)
+        baseline = baseline or throughput
+        print(f'{threads:3d} threads  {throughput:12,.0f} docs/s  {throughput / baseline:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Benchmark the quoting of unquoted symbols, like the keys of a JavaScript object literal.
+#
+#   python -m benchmarks.bench_unquoted
+import json
+import random
+import string
+import timeit
+
+from json_fixer import fix_json
+from json_fixer.fixer import quote_string
+
+
+def generate_symbols(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + '_$'
+    # symbols start with a letter, but not with e or E which would be parsed as the exponent of a number
+    first = string.ascii_letters.replace('e', '').replace('E', '')
+    return [rng.choice(first) + ''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 15)))
+            for _ in range(count)]
+
+
+def generate_object_literal(count: int, seed: int = 1):
+    # {key0: value0, key1: value1, ...} with unquoted keys and values
+    symbols = generate_symbols(count * 2, seed)
+    pairs = [f'{symbols[index]}: {symbols[index + 1]}' for index in range(0, len(symbols), 2)]
+    return '{' + ', '.join(pairs) + '}'
+
+
+def report(name: str, seconds: float, count: int):
+    print(f'{name:<40} {seconds * 1000:8.2f} ms  {count / seconds:12,.0f} /s')
+
+
+def main():
+    repeat = 5
+    symbols = generate_symbols(50_000)
+    for name, quote in [('json.dumps', json.dumps), ('quote_string', quote_string)]:
+        seconds = min(timeit.repeat(lambda: [quote(symbol) for symbol in symbols], number=1, repeat=repeat))
+        report(f'{name} (symbols)', seconds, len(symbols))
+
+    for count in [1_000, 5_000, 10_000]:
+        text = generate_object_literal(count)
+        seconds = min(timeit.repeat(lambda: fix_json(text), number=1, repeat=repeat))
+        report(f'fix_json ({count} unquoted pairs)', seconds, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# Algorithmic complexity fuzzer: generates inputs of growing size for every kind of repair,
+# fits the repair time against the input size on a log-log scale, and reports the paths that
+# grow worse than linear. A slope of 1 means linear time, 2 means quadratic time.
+#
+#   python -m benchmarks.complexity                    measure the templates and the saved corpus
+#   python -m benchmarks.complexity --fuzz 200 --save  search random templates, save the worst ones
+#
+# The saved corpus is checked by json_fixer/complexity_test.py.
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+from json_fixer import fix_json
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'complexity_corpus.json')
+
+# an input is prefix + unit * n + suffix, with n chosen to reach the requested size
+TEMPLATES = {
+    'valid': ('[', '{"a": [1, 2.5, "str", true, null]},\n', '{}]'),
+    'missing_commas_array': ('[', '1 ', ']'),
+    'missing_commas_newline': ('[', '{}\n', ']'),
+    'missing_commas_object': ('{', '"key": "value"\n', '}'),
+    'missing_colons': ('{', '"key" "value", ', '}'),
+    'trailing_commas': ('[', '{"a": 1, }, ', '{}]'),
+    'truncated_end': ('[', '{"a": [1, 2]}, ', '{"b": [1, {"c": "trunc'),
+    'missing_object_values': ('{', '"a":, ', '"z": 1}'),
+    'concatenated_strings': ('', '"text" + ', '"end"'),
+    'unquoted_strings': ('{', 'key: value, ', 'end: 1}'),
+    'unquoted_strings_with_whitespace': ('[', 'hello   world   , ', '1]'),
+    'single_quotes': ('{', "'key': 'value', ", "'end': 1}"),
+    'special_quotes': ('[', '“text”, ', '1]'),
+    'special_whitespace': ('[', '1,  ', '1]'),
+    'python_constants': ('[', 'True, False, None, ', '1]'),
+    'comments': ('[', '/* comment */ 1, // line\n', '1]'),
+    'escaped_string': ('{\\"', 'stringified\\": \\"content\\", \\"', 'end\\": 1}'),
+    'control_characters': ('"', 'line\n\ttab ', '"'),
+    'mongo_calls': ('[', 'NumberLong("2"), ', '1]'),
+    'ndjson': ('', '{"id": 1}\n', ''),
+    'undefined': ('[', 'undefined, ', '1]'),
+}
+
+# building blocks of random templates for the fuzzer
+FRAGMENTS = [
+    '1', '2.5', '-', 'e', '"str"', "'str'", '“str”', 'word', 'two words', 'True', 'None', 'undefined',
+    '{}', '[]', '{"a": 1}', '{a: 1', '[1', ',', ', ', ':', ' ', '\n', '\t', ' ', '/* c */', '// c\n',
+    ' + ', 'f(', ')', '\\"', ';',
+]
+WRAPPERS = [('[', ']'), ('{"a": [', ']}'), ('', ''), ('[', ''), ('{', '}')]
+
+# input sizes in characters
+DEFAULT_SIZES = (16_000, 32_000, 64_000, 128_000)
+
+# inputs repaired faster than this (in seconds) at the largest size stop at an early error,
+# their timings are too noisy to fit a slope
+MIN_SECONDS = 0.002
+
+
+def generate(template, size: int):
+    prefix, unit, suffix = template
+    return prefix + unit * max(1, size // len(unit)) + suffix
+
+
+def time_repair(text: str, repeat: int):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            fix_json(text, recover=True)
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fit_slope(points):
+    # least squares slope of log(time) against log(size)
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def measure(template, sizes=DEFAULT_SIZES, repeat: int = 3):
+    # returns the fitted slope, or None when the template cannot be measured
+    points = []
+    for size in sizes:
+        text = generate(template, size)
+        seconds = time_repair(text, repeat)
+        if seconds is None:
+            return None
+        points.append((len(text), max(seconds, 1e-7)))
+    if points[-1][1] < MIN_SECONDS:
+        return None
+    return fit_slope(points)
+
+
+def measure_min(template, attempts: int = 3, max_slope: float = None, **kwargs):
+    # Timings on a busy machine are noisy and only ever make a slope steeper: measure again
+    # when the slope exceeds max_slope, and return the lowest slope
+    best = None
+    for _ in range(attempts):
+        slope = measure(template, **kwargs)
+        if slope is None:
+            return None
+        best = slope if best is None else min(best, slope)
+        if max_slope is not None and best <= max_slope:
+            break
+    return best
+
+
+def random_template(rng: random.Random):
+    prefix, suffix = rng.choice(WRAPPERS)
+    unit = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 4)))
+    return prefix, unit, suffix
+
+
+def fuzz(iterations: int, seed: int = 0, keep: int = 10, sizes=DEFAULT_SIZES[:3]):
+    # returns the `keep` random templates with the steepest slopes
+    rng = random.Random(seed)
+    results = []
+    for _ in range(iterations):
+        template = random_template(rng)
+        slope = measure(template, sizes, repeat=1)
+        if slope is not None:
+            results.append((slope, template))
+    results.sort(key=lambda result: result[0], reverse=True)
+    return results[:keep]
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return {name: tuple(template) for name, template in json.load(file).items()}
+
+
+def save_corpus(corpus, path: str = CORPUS_PATH):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({name: list(template) for name, template in sorted(corpus.items())}, file, indent=2)
+        file.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect repair paths of fix_json that grow worse than linear.')
+    parser.add_argument('--fuzz', type=int, default=0, metavar='N', help='measure N random templates')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random templates')
+    parser.add_argument('--save', action='store_true', help='add the worst random templates to the corpus')
+    parser.add_argument('--max-slope', type=float, default=1.3, help='slope considered super-linear')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    failures = 0
+    for name, template in list(TEMPLATES.items()) + list(corpus.items()):
+        slope = measure_min(template, max_slope=args.max_slope)
+        status = 'n/a' if slope is None else 'SUPER-LINEAR' if slope > args.max_slope else 'ok'
+        failures += status == 'SUPER-LINEAR'
+        print(f'{name:<40} {"" if slope is None else f"{slope:5.2f}":>5}  {status}')
+
+    if args.fuzz:
+        worst = fuzz(args.fuzz, args.seed)
+        print(f'\nsteepest of {args.fuzz} random templates:')
+        for slope, template in worst:
+            print(f'{slope:5.2f}  {template!r}')
+        if args.save:
+            for slope, template in worst:
+                corpus[f'fuzz_{len(corpus) + 1:03d}'] = template
+            save_corpus(corpus)
+            print(f'saved to {CORPUS_PATH}')
+
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,10 @@
-from .fixer import fix_json, JSONFixError
+from .fixer import fix_json, JSONFixError, REPAIRS, REPAIR_KINDS
+from .adaptive import AdaptiveFixer
+from .diagnose import Diagnosis, diagnose
+from .embedded import extract_and_fix, find_json
+from .extract import fix_json_extract
+from .literal import fix_python_literal
+from .offsets import OffsetMap
+from .sequence import build_offset_index, iter_root_values, load_offset_index, read_root_value
+from .parallel import fix_json_parallel
+from .shared import SharedMemoryPool
@@ -0,0 +1,242 @@
+# Adaptive front end for streams of documents from many producers, where every producer
+# tends to break its documents in the same way: one always cuts them off, another always
+# sends Python reprs.
+#
+# AdaptiveFixer keeps a window of recent documents for every source id given by the caller,
+# labeled with the cheapest strategy which would have repaired them, and picks the cheapest
+# strategy which covers most of the window:
+#
+#   valid           json.loads accepts the document, which is returned as it is
+#   truncated       a valid document cut off at the end, completed by appending to its tail
+#   python_literal  the fast path for Python literals of fix_python_literal
+#   full            fix_json
+#
+# When the strategy of a source does not fit a document, the document is repaired by fix_json
+# instead, and labeled by the repairs it needed. The outputs are the outputs of fix_json, except
+# for Python literals with tuples, which are reformatted like fix_python_literal does.
+import threading
+from collections import deque
+
+from .diagnose import is_valid_json
+from .fixer import fix_json_reporting
+from .literal import python_literal_to_json
+from .utils import compiled_pattern
+
+STRATEGIES = ('valid', 'truncated', 'python_literal', 'full')
+
+# the repairs which only a strategy and the ones after it make
+_truncation_repairs = frozenset(['missing_bracket', 'missing_quote', 'missing_value', 'trailing_comma',
+                                 'truncated_number'])
+_literal_repairs = frozenset(['python_constants', 'special_quotes', 'trailing_comma'])
+
+# the labels of the documents every strategy repairs
+_covered_labels = (
+    ('valid', frozenset(['valid'])),
+    ('truncated', frozenset(['valid', 'truncated'])),
+    ('python_literal', frozenset(['valid', 'python_literal'])),
+)
+
+DEFAULT_WINDOW = 32
+DEFAULT_MIN_SAMPLES = 8
+DEFAULT_THRESHOLD = 0.8
+
+# a string, with a group for its end quote, or a bracket
+strings_and_brackets = r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]'
+
+
+def _strip_whitespace(text: str):
+    # returns a tuple (text without the whitespace at its end, the whitespace)
+    core = text.rstrip(' \t\n\r')
+    return core, text[len(core):]
+
+
+def complete_truncated(text: str, applied_repairs: set = None):
+    # Returns a valid JSON document which was cut off at the end completed like fix_json would
+    # complete it, by closing the string, number, objects and arrays at its end. Returns None
+    # when the text is not such a document. The kinds of the repairs are added to the set
+    # applied_repairs when given
+    closers = []
+    repairs = set()
+    suffix = ''
+    for match in compiled_pattern(strings_and_brackets).finditer(text):
+        token = match.group()
+        if token[0] == '"':
+            if match.group(1) is None:
+                suffix = '"'
+                repairs.add('missing_quote')
+        elif token == '{':
+            closers.append('}')
+        elif token == '[':
+            closers.append(']')
+        elif not closers or closers.pop() != token:
+            return None
+
+    if suffix:
+        # the whitespace at the end belongs to the string
+        core, whitespace = text, ''
+    else:
+        core, whitespace = _strip_whitespace(text)
+    if not suffix and core:
+        last = core[-1]
+        if last == ',':
+            # the whitespace in front of the comma ends up after the closing brackets
+            core, before = _strip_whitespace(core[:-1])
+            whitespace = before + whitespace
+            repairs.add('trailing_comma')
+        elif last == ':':
+            core += whitespace
+            whitespace = ''
+            suffix = 'null'
+            repairs.add('missing_value')
+        elif not whitespace and (last in '-+' or last == '.' and core[-2:-1].isdigit()
+                                 or last in 'eE' and core[-2:-1] in '0123456789.'):
+            # fix_json completes a number only when it is cut off at the very end
+            suffix = '0'
+            repairs.add('truncated_number')
+    if closers:
+        repairs.add('missing_bracket')
+    if not repairs:
+        # nothing cut off, the text is either valid as it is or not a document at all
+        return text if is_valid_json(text) else None
+
+    output = core + suffix + ''.join(reversed(closers)) + whitespace
+    if not is_valid_json(output):
+        return None
+    if applied_repairs is not None:
+        applied_repairs.update(repairs)
+    return output
+
+
+def label_repairs(repairs):
+    # returns the cheapest strategy which makes the repairs
+    if not repairs:
+        return 'valid'
+    if repairs <= _truncation_repairs:
+        return 'truncated'
+    if repairs <= _literal_repairs:
+        return 'python_literal'
+    return 'full'
+
+
+class _Source:
+    # the statistics of one source
+    def __init__(self, window: int):
+        self.labels = deque(maxlen=window)
+        self.label_counts = dict.fromkeys(STRATEGIES, 0)  # of the labels in the window
+        self.documents = 0
+        self.errors = 0
+        self.strategy = 'full'
+        self.attempts = dict.fromkeys(STRATEGIES, 0)
+        self.fallbacks = dict.fromkeys(STRATEGIES, 0)
+        self.repairs = {}
+
+
+class AdaptiveFixer:
+    # Repairs documents like fix_json(text), choosing a strategy for every source by the
+    # documents it sent recently: after min_samples documents, the cheapest strategy which
+    # would have repaired at least the threshold share of the last window documents. Calls
+    # can be made from several threads at once
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 threshold: float = DEFAULT_THRESHOLD):
+        if window < 1 or not 1 <= min_samples <= window:
+            raise ValueError(f'Invalid window {window} and min_samples {min_samples}, '
+                             f'expected 1 <= min_samples <= window')
+        if not 0 < threshold <= 1:
+            raise ValueError(f'Invalid threshold {threshold}, expected a number in (0, 1]')
+        self.window = window
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def strategy(self, source):
+        # returns the strategy the next document of the source goes through
+        with self._lock:
+            state = self._sources.get(source)
+            return 'full' if state is None else state.strategy
+
+    def fix(self, text: str, source=None):
+        # Repairs the text, and raises the JSONFixError of fix_json when it cannot be repaired
+        strategy = self.strategy(source)
+        repairs = set()
+        output = None
+        if strategy == 'valid':
+            if is_valid_json(text):
+                output = text
+        elif strategy == 'truncated':
+            output = complete_truncated(text, repairs)
+        elif strategy == 'python_literal':
+            output = python_literal_to_json(text)
+            if output is not None:
+                # the repairs are unknown, the text may as well be valid JSON
+                repairs = None if output != text else repairs
+
+        if output is not None:
+            label = strategy if repairs is None else label_repairs(repairs)
+            self._record(source, strategy, label, repairs, fallback=False)
+            return output
+
+        fallback = strategy != 'full'
+        try:
+            output = fix_json_reporting(text, repairs)
+        except Exception:
+            # unfixable documents are not labeled, no strategy repairs them
+            self._record(source, strategy, None, repairs, fallback)
+            raise
+        label = label_repairs(repairs)
+        if label == strategy and fallback:
+            # the strategy makes the same kinds of repairs, but could not repair this document
+            label = 'full'
+        self._record(source, strategy, label, repairs, fallback)
+        return output
+
+    def _record(self, source, strategy: str, label, repairs, fallback: bool):
+        with self._lock:
+            state = self._sources.get(source)
+            if state is None:
+                state = self._sources[source] = _Source(self.window)
+            state.documents += 1
+            state.attempts[strategy] += 1
+            if fallback:
+                state.fallbacks[strategy] += 1
+            for kind in repairs or ():
+                state.repairs[kind] = state.repairs.get(kind, 0) + 1
+            if label is None:
+                state.errors += 1
+                return
+            if len(state.labels) == self.window:
+                state.label_counts[state.labels[0]] -= 1
+            state.labels.append(label)
+            state.label_counts[label] += 1
+            state.strategy = self._choose(state)
+
+    def _choose(self, state: _Source):
+        if len(state.labels) < self.min_samples:
+            return 'full'
+        required = self.threshold * len(state.labels)
+        for strategy, covered in _covered_labels:
+            if sum(state.label_counts[label] for label in covered) >= required:
+                return strategy
+        return 'full'
+
+    def stats(self):
+        # Returns a dict with the statistics of every source, for monitoring: the number of
+        # documents and unfixable ones, the current strategy, how often every strategy was
+        # tried and fell back to fix_json, and how often every kind of repair was made
+        with self._lock:
+            return {source: {
+                'documents': state.documents,
+                'errors': state.errors,
+                'strategy': state.strategy,
+                'attempts': dict(state.attempts),
+                'fallbacks': dict(state.fallbacks),
+                'repairs': dict(state.repairs),
+            } for source, state in self._sources.items()}
+
+    def reset(self, source=None):
+        # forgets the statistics of the source, or of all sources
+        with self._lock:
+            if source is None:
+                self._sources.clear()
+            else:
+                self._sources.pop(source, None)
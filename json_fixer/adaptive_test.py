@@ -0,0 +1,120 @@
+import json
+import unittest
+
+from json_fixer.adaptive import AdaptiveFixer, complete_truncated
+from json_fixer.fixer import JSONFixError, fix_json
+
+
+class TestCompleteTruncated(unittest.TestCase):
+    def test_should_complete_like_fix_json(self):
+        for text in ['[1, 2 \n', '[1 ,', '[1, 2, ', '{"a": ', '{"a":', '{"a": \n', '{"a": 1, "b": "x',
+                     '[1.', '[-', '[1e', '[1e+', '["a\\"', '  {"a": [1, 2]  ', '[{}, ', '{"a": 1,\n  ',
+                     '["a  ', '[true', '{"a": {"b": [false']:
+            repairs = set()
+            self.assertEqual(complete_truncated(text, repairs), fix_json(text), text)
+            self.assertTrue(repairs, text)
+
+    def test_should_report_the_repairs(self):
+        repairs = set()
+        complete_truncated('{"a": [1, 2.', repairs)
+        self.assertEqual(repairs, {'missing_bracket', 'truncated_number'})
+        repairs = set()
+        complete_truncated('{"a": "b', repairs)
+        self.assertEqual(repairs, {'missing_bracket', 'missing_quote'})
+
+    def test_should_pass_valid_json(self):
+        repairs = set()
+        self.assertEqual(complete_truncated('{"a": [1, "]"]} ', repairs), '{"a": [1, "]"]} ')
+        self.assertEqual(repairs, set())
+
+    def test_should_reject_other_documents(self):
+        for text in ['', '{"a"', '{"a": tr', '[1. ', '["a\\', "['a'", '[1 2', '{"a": 1]', '[1]]', 'abc',
+                     '[1, /* x */', '{"a": 1}\n{"b": 2']:
+            self.assertIsNone(complete_truncated(text), text)
+
+
+def fixed(fixer, texts, source):
+    return [fixer.fix(text, source) for text in texts]
+
+
+class TestAdaptiveFixer(unittest.TestCase):
+    def test_should_start_with_the_full_repair(self):
+        fixer = AdaptiveFixer()
+        self.assertEqual(fixer.strategy('a'), 'full')
+        self.assertEqual(fixer.fix('[1, 2', 'a'), '[1, 2]')
+        self.assertEqual(fixer.strategy('a'), 'full')
+
+    def test_should_pick_a_strategy_per_source(self):
+        fixer = AdaptiveFixer(window=8, min_samples=4)
+        sources = {
+            'valid': ['{"id": %d}' % index for index in range(8)],
+            'truncated': ['{"id": %d, "tags": ["a' % index for index in range(8)],
+            'python_literal': ["{'id': %d, 'ok': True}" % index for index in range(8)],
+            'full': ["{id: %d, /* note */ ok: yes}" % index for index in range(8)],
+        }
+        for source, texts in sources.items():
+            self.assertEqual(fixed(fixer, texts, source), [fix_json(text) for text in texts], source)
+            self.assertEqual(fixer.strategy(source), source)
+
+        stats = fixer.stats()
+        self.assertEqual(stats['truncated']['documents'], 8)
+        self.assertEqual(stats['truncated']['attempts'], {'valid': 0, 'truncated': 4, 'python_literal': 0, 'full': 4})
+        self.assertEqual(stats['truncated']['fallbacks']['truncated'], 0)
+        self.assertEqual(stats['truncated']['repairs'], {'missing_bracket': 8, 'missing_quote': 8})
+        self.assertEqual(stats['valid']['repairs'], {})
+
+    def test_should_fall_back_on_mismatch(self):
+        fixer = AdaptiveFixer(window=4, min_samples=4, threshold=0.75)
+        fixed(fixer, ['[1, 2'] * 4, 'a')
+        self.assertEqual(fixer.strategy('a'), 'truncated')
+
+        self.assertEqual(fixer.fix("[True, 'x']", 'a'), '[true, "x"]')
+        self.assertEqual(fixer.strategy('a'), 'truncated')
+        stats = fixer.stats()['a']
+        self.assertEqual((stats['attempts']['truncated'], stats['fallbacks']['truncated']), (1, 1))
+
+        # the source changed to python literals
+        fixed(fixer, ["[True, 'x']"] * 3, 'a')
+        self.assertEqual(fixer.strategy('a'), 'python_literal')
+
+    def test_should_not_keep_a_strategy_which_fails(self):
+        # truncated documents with partial keywords need the full repair
+        fixer = AdaptiveFixer(window=4, min_samples=4)
+        fixed(fixer, ['[1, 2'] * 4, 'a')
+        fixed(fixer, ['[1, tr'] * 4, 'a')
+        self.assertEqual(fixer.strategy('a'), 'full')
+
+    def test_should_raise_and_count_unfixable_documents(self):
+        fixer = AdaptiveFixer(window=4, min_samples=4)
+        fixed(fixer, ['[1]'] * 4, 'a')
+        self.assertEqual(fixer.strategy('a'), 'valid')
+        with self.assertRaises(JSONFixError):
+            fixer.fix('{"a" @}', 'a')
+        stats = fixer.stats()['a']
+        self.assertEqual((stats['documents'], stats['errors'], stats['fallbacks']['valid']), (5, 1, 1))
+        # no strategy repairs them, so they do not count against the current one
+        self.assertEqual(fixer.strategy('a'), 'valid')
+
+    def test_should_reset_the_statistics(self):
+        fixer = AdaptiveFixer(window=4, min_samples=4)
+        fixed(fixer, ['[1]'] * 4, 'a')
+        fixed(fixer, ['[1]'] * 4, 'b')
+        fixer.reset('a')
+        self.assertEqual(set(fixer.stats()), {'b'})
+        fixer.reset()
+        self.assertEqual(fixer.stats(), {})
+
+    def test_should_return_json_serializable_stats(self):
+        fixer = AdaptiveFixer()
+        fixer.fix('[1, 2', 'a')
+        self.assertEqual(json.loads(json.dumps(fixer.stats()))['a']['repairs'], {'missing_bracket': 1})
+
+    def test_should_validate_the_options(self):
+        for options in [{'window': 0}, {'min_samples': 0}, {'window': 4, 'min_samples': 5}, {'threshold': 0},
+                        {'threshold': 1.5}]:
+            with self.assertRaises(ValueError, msg=options):
+                AdaptiveFixer(**options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import unittest
+
+# slope of log(time) against log(size): 1 is linear, 2 is quadratic
+MAX_SLOPE = 1.3
+
+
+# The slopes are fitted to wall-clock timings, which take long and depend on the load of the
+# machine, so these tests only run when asked for, with make test-complexity
+@unittest.skipUnless(os.environ.get('JSON_FIXER_COMPLEXITY_TESTS'),
+                     'set JSON_FIXER_COMPLEXITY_TESTS=1 to run the timing based complexity tests')
+class TestRepairComplexity(unittest.TestCase):
+    def assert_linear(self, templates):
+        # the benchmarks directory is importable from the root of the repository only
+        from benchmarks.complexity import measure_min
+        for name, template in templates.items():
+            with self.subTest(name):
+                slope = measure_min(template, max_slope=MAX_SLOPE, repeat=1)
+                if slope is not None:
+                    self.assertLessEqual(slope, MAX_SLOPE, f'{name} {template!r} grows with slope {slope:.2f}')
+
+    def test_repairs_should_take_linear_time(self):
+        from benchmarks.complexity import TEMPLATES
+        self.assert_linear(TEMPLATES)
+
+    def test_saved_worst_cases_should_take_linear_time(self):
+        from benchmarks.complexity import load_corpus
+        self.assert_linear(load_corpus())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+# Decide what to do with a document without repairing it first: pass it through when it is
+# valid JSON, repair it when it is fixable, or reject it.
+#
+# Valid documents, the common case, are recognized by json.loads, which runs in C and is many
+# times faster than fix_json. Invalid documents made of strict JSON tokens, like documents cut
+# off at the end or with trailing or missing commas, are scanned token by token with a regular
+# expression, which tracks the repairs fix_json makes and the change of the output size
+# instead of building the output. Anything else, like comments, single quotes or unquoted
+# strings, goes through the parser of fix_json, which reports the kinds of its repairs.
+from collections import namedtuple
+
+from .fixer import REPAIR_KINDS, JSONFixError, fix_json_reporting
+from .utils import compiled_pattern
+
+# valid: whether the text is valid JSON as it is
+# repairs: the REPAIR_KINDS fix_json applies to the text, in the order of REPAIR_KINDS. For
+#   an unfixable text, the repairs applied before the error
+# error: the JSONFixError when the text cannot be repaired, None otherwise
+# output_size: the length of the output of fix_json, None when the text cannot be repaired
+Diagnosis = namedtuple('Diagnosis', ['valid', 'repairs', 'error', 'output_size'])
+
+# a token of strict JSON after whitespace: a string, which may be cut off at the end, the
+# start of a number, a word, which may be a keyword, or a structural character
+json_token = (r'[ \t\n\r]*(?:(?P<string>"(?:[^"\\\x00-\x1f]+|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*)(?P<quote>"?)'
+              r'|(?P<number>(?=[-0-9])-?[0-9]*(?:\.[0-9]*)?(?:[eE][+-]?[0-9]*)?)|(?P<word>[a-zA-Z]+)'
+              r'|(?P<structural>[{}\[\]:,]))?')
+strict_number = r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?'
+# a number cut off at the end, which fix_json completes with a 0
+cut_off_number = r'-|-?(?:0|[1-9][0-9]*)(?:\.|(?:\.[0-9]+)?[eE][+-]?)'
+# an escape sequence cut off at the end of a string, which fix_json removes
+cut_off_escape = r'\\(?:u[0-9a-fA-F]{0,3})?'
+
+keywords = ('true', 'false', 'null')
+
+
+def _reject_constant(name: str):
+    # json.loads accepts NaN and Infinity, which are not valid JSON
+    raise ValueError(name)
+
+
+def is_valid_json(text: str):
+    import json
+    try:
+        json.loads(text, parse_constant=_reject_constant)
+    except (ValueError, RecursionError):
+        return False
+    return True
+
+
+def _scan_scalar(text: str, match, repairs: set):
+    # Returns a tuple (end, change of the output size) for the string, number or keyword of
+    # the token, or None when fix_json repairs it in another way than the scanner knows
+    kind = match.lastgroup
+    end = match.end()
+    if kind == 'quote':
+        if match.group('quote'):
+            return end, 0
+        if end == len(text):
+            repairs.add('missing_quote')
+            return end, 1
+        if compiled_pattern(cut_off_escape).fullmatch(text, end):
+            repairs.add('string_escapes')
+            repairs.add('missing_quote')
+            return len(text), 1 - (len(text) - end)
+    elif kind == 'number':
+        number = match.group('number')
+        if compiled_pattern(strict_number).fullmatch(number):
+            return end, 0
+        if end == len(text) and compiled_pattern(cut_off_number).fullmatch(number):
+            repairs.add('truncated_number')
+            return end, 1
+    elif kind == 'word':
+        word = match.group('word')
+        if word in keywords:
+            return end, 0
+        if end == len(text) and any(keyword.startswith(word) for keyword in keywords):
+            # a keyword cut off at the end, which fix_json quotes like an unquoted string
+            repairs.add('unquoted_strings')
+            return end, 2
+    return None
+
+
+def _scan(text: str):
+    # Returns the Diagnosis of an invalid text made of strict JSON tokens, following the
+    # repairs of the parser of fix_json: closing the objects, arrays, strings and numbers cut
+    # off at the end, removing trailing commas, and inserting missing commas, colons and
+    # values. Returns None for any other text
+    next_token = compiled_pattern(json_token).match
+    repairs = set()
+    size = len(text)  # the size of the output of fix_json
+    containers = []  # the opening brackets of the objects and arrays around the token
+    # what comes next: 'value', 'first_item' or 'item' after a comma, 'first_key' or 'key'
+    # after a comma, 'colon' after a key, or 'after' a value
+    state = 'value'
+    index = 0
+    while True:
+        match = next_token(text, index)
+        kind = match.lastgroup
+        index = match.end()
+        if kind is None:
+            if index < len(text):
+                # a character which is not a strict JSON token
+                return None
+            break
+        start = match.start('string' if kind == 'quote' else kind)
+        char = text[start] if kind == 'structural' else None
+
+        if state == 'colon':
+            if char == ':':
+                state = 'value'
+            elif char is None or char in '{[':
+                # a missing colon in front of the value, which is scanned next
+                repairs.add('missing_colon')
+                size += 1
+                state = 'value'
+                index = start
+            else:
+                error = JSONFixError('Colon expected', start, 'colon_expected')
+                return Diagnosis(False, _ordered(repairs), error, None)
+        elif state == 'after':
+            if not containers:
+                # more than one root value, like newline delimited JSON
+                return None
+            if char == ',':
+                state = 'item' if containers[-1] == '[' else 'key'
+            elif char == (']' if containers[-1] == '[' else '}'):
+                containers.pop()
+            elif containers[-1] == '[' and (char is None or char in '{[') or containers[-1] == '{' and kind == 'quote':
+                # a missing comma in front of the item or member, which is scanned next
+                repairs.add('missing_comma')
+                size += 1
+                state = 'item' if containers[-1] == '[' else 'key'
+                index = start
+            else:
+                return None
+        elif state == 'first_key' or state == 'key':
+            if kind == 'quote':
+                scanned = _scan_scalar(text, match, repairs)
+                if scanned is None:
+                    return None
+                index, change = scanned
+                size += change
+                if text.startswith(':', index):
+                    # the common case of a colon right after the key
+                    index += 1
+                    state = 'value'
+                else:
+                    state = 'colon'
+            elif char == '}':
+                if state == 'key':
+                    repairs.add('trailing_comma')
+                    size -= 1
+                containers.pop()
+                state = 'after'
+            else:
+                return None
+        elif char is None:
+            scanned = _scan_scalar(text, match, repairs)
+            if scanned is None:
+                return None
+            index, change = scanned
+            size += change
+            if containers and text.startswith(',', index):
+                # the common case of a comma right after the value
+                index += 1
+                state = 'item' if containers[-1] == '[' else 'key'
+            else:
+                state = 'after'
+        elif char in '{[':
+            containers.append(char)
+            state = 'first_key' if char == '{' else 'first_item'
+        elif char == ']' and state != 'value':
+            if state == 'item':
+                repairs.add('trailing_comma')
+                size -= 1
+            containers.pop()
+            state = 'after'
+        elif state == 'value' and containers and char in ',}':
+            # a missing value after the colon, the token is scanned again after the null
+            repairs.add('missing_value')
+            size += 4
+            state = 'after'
+            index = start
+        else:
+            return None
+
+    # the end of the text
+    if state == 'value':
+        if not containers:
+            # an empty document
+            return None
+        repairs.add('missing_value')
+        size += 4
+    elif state == 'item' or state == 'key':
+        repairs.add('trailing_comma')
+        size -= 1
+    elif state == 'colon':
+        error = JSONFixError('Colon expected', len(text), 'colon_expected')
+        return Diagnosis(False, _ordered(repairs), error, None)
+    if containers:
+        repairs.add('missing_bracket')
+        size += len(containers)
+    return Diagnosis(False, _ordered(repairs), None, size)
+
+
+def _ordered(repairs: set):
+    return tuple(kind for kind in REPAIR_KINDS if kind in repairs)
+
+
+def diagnose_with_parser(text: str):
+    # Returns the Diagnosis of an invalid text from the parser of fix_json
+    applied_repairs = set()
+    try:
+        output_size = len(fix_json_reporting(text, applied_repairs))
+        error = None
+    except JSONFixError as err:
+        output_size = None
+        error = err.with_traceback(None)
+    return Diagnosis(False, _ordered(applied_repairs), error, output_size)
+
+
+def diagnose(text: str):
+    # Returns a Diagnosis of the text, for fix_json with the default options
+    if is_valid_json(text):
+        return Diagnosis(True, (), None, len(text))
+    diagnosis = _scan(text)
+    if diagnosis is None:
+        diagnosis = diagnose_with_parser(text)
+    return diagnosis
@@ -0,0 +1,83 @@
+import json
+import random
+import unittest
+
+from json_fixer.diagnose import diagnose, diagnose_with_parser
+from json_fixer.fixer import REPAIR_KINDS, fix_json
+
+
+class TestDiagnose(unittest.TestCase):
+    examples = {
+        'comments': '[1, /* 2 */ 3]',
+        'concatenation': '["a" + "b"]',
+        'escaped_strings': '{\\"a\\": 1}',
+        'jsonp': 'callback({"a": 1});',
+        'mongo': '{"a": NumberLong("2")}',
+        'ndjson': '{"a": 1}\n{"b": 2}',
+        'python_constants': '[True, None]',
+        'special_quotes': "['a']",
+        'special_whitespace': '[1,\u00a02]',
+        'unquoted_strings': '{a: 1}',
+        'missing_bracket': '{"a": [1',
+        'missing_colon': '{"a" 1}',
+        'missing_comma': '[1 2]',
+        'missing_quote': '["a',
+        'missing_value': '{"a":}',
+        'string_escapes': '["a\\xb"]',
+        'trailing_comma': '[1, 2,]',
+        'truncated_number': '[1, 2.',
+    }
+
+    def test_should_cover_all_repair_kinds(self):
+        self.assertEqual(set(self.examples), set(REPAIR_KINDS))
+
+    def test_should_pass_valid_json(self):
+        for text in ['{"a": [1, 2.5e3, "b\\n", true, null]}', ' [] ', '"text"', '-0']:
+            self.assertEqual(diagnose(text), (True, (), None, len(text)), text)
+
+    def test_should_report_the_repair_kinds(self):
+        for kind, text in self.examples.items():
+            diagnosis = diagnose(text)
+            self.assertFalse(diagnosis.valid, kind)
+            self.assertIn(kind, diagnosis.repairs, kind)
+            self.assertIsNone(diagnosis.error, kind)
+            self.assertEqual(diagnosis.output_size, len(fix_json(text)), kind)
+
+    def test_should_report_only_the_repairs_made(self):
+        self.assertEqual(diagnose("{name: 'John', tags: [1 2,]").repairs,
+                         ('special_quotes', 'unquoted_strings', 'missing_bracket', 'missing_comma', 'trailing_comma'))
+        self.assertEqual(diagnose('[NaN]').repairs, ('unquoted_strings',))
+
+    def test_should_report_unfixable_input(self):
+        diagnosis = diagnose('{"a": 1, "b" @}')
+        self.assertFalse(diagnosis.valid)
+        self.assertEqual((diagnosis.error.code, diagnosis.error.position), ('colon_expected', 13))
+        self.assertIsNone(diagnosis.output_size)
+
+    def test_should_report_unfixable_input_of_json_tokens(self):
+        for text in ['{"a": 1, "b"}', '{"a": 1, "bc', '{"a" , "b": 2}']:
+            diagnosis = diagnose(text)
+            expected = diagnose_with_parser(text)
+            self.assertEqual((diagnosis.repairs, str(diagnosis.error), diagnosis.error.code),
+                             (expected.repairs, str(expected.error), expected.error.code), text)
+
+    def test_should_match_the_parser(self):
+        # the documents cut off, or with characters removed or inserted, mostly consist of JSON
+        # tokens, which are diagnosed without the parser
+        rng = random.Random(1)
+        document = json.dumps({'id': 1, 'user': {'name': 'a b', 'tags': ['x', 'y\n']}, 'score': -1.5e-3,
+                               'flags': [True, False, None], 'empty': {}, 'list': [[]], 'text': 'a \\ "b" \u00e9'})
+        texts = [document[:end] for end in range(len(document))]
+        for _ in range(500):
+            index = rng.randrange(len(document))
+            texts.append(document[:index] + rng.choice(['', ',', ':', '"', ']', '}', ' 1']) + document[index + 1:])
+        for text in texts:
+            diagnosis = diagnose(text)
+            if not diagnosis.valid:
+                expected = diagnose_with_parser(text)
+                self.assertEqual((diagnosis.repairs, str(diagnosis.error), diagnosis.output_size),
+                                 (expected.repairs, str(expected.error), expected.output_size), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
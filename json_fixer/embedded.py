@@ -0,0 +1,110 @@
+# Find JSON embedded in other text, like the answer of a language model with prose around
+# a ```json fence, or a log line with a timestamp prefix, and repair every piece of it.
+#
+# The text is scanned once. Fenced code blocks labeled as JSON (or unlabeled ones starting
+# with a bracket) are taken as a whole, code blocks in other languages are skipped. Outside of
+# fences, every opening bracket followed by something that looks like JSON starts a span,
+# which ends at the matching closing bracket, skipping strings and comments, or at the end of
+# the text when the JSON is cut off. The scan continues after the span.
+from .fixer import JSONFixError, fix_json
+from .scanner import skip_value
+from .utils import compiled_pattern, is_quote, is_whitespace
+
+# languages of fenced code blocks which contain JSON
+JSON_FENCE_LANGUAGES = frozenset(['', 'json', 'jsonc', 'json5', 'jsonl', 'ndjson'])
+
+FENCE = '```'
+
+# a fence or an opening bracket
+start_of_span = r'```|[{\[]'
+
+
+def _skip_whitespace(text: str, index: int, end: int):
+    while index < end and is_whitespace(ord(text[index])):
+        index += 1
+    return index
+
+
+def _strip(text: str, start: int, end: int):
+    # returns the span (start, end) without the whitespace around it
+    start = _skip_whitespace(text, start, end)
+    while end > start and is_whitespace(ord(text[end - 1])):
+        end -= 1
+    return start, end
+
+
+def _looks_like_json(text: str, start: int):
+    # Whether the bracket at text[start] starts JSON rather than prose like [citation needed]
+    # or {see below}: an object must start with a key followed by a colon, and an array with
+    # a value
+    index = _skip_whitespace(text, start + 1, len(text))
+    if index >= len(text):
+        return False
+    char = text[index]
+    if text[start] == '{':
+        if char == '}' or is_quote(ord(char)):
+            return True
+        # an unquoted key
+        end = index
+        while end < len(text) and (text[end].isalnum() or text[end] in '_$'):
+            end += 1
+        colon = _skip_whitespace(text, end, len(text))
+        return end > index and colon < len(text) and text[colon] == ':'
+    return char in '{[-]' or char.isdigit() or is_quote(ord(char)) or text.startswith(('true', 'false', 'null'), index)
+
+
+def _fence_span(text: str, start: int):
+    # text[start:] starts with a fence. Returns a tuple (span or None, index after the block)
+    content_start = start + len(FENCE)
+    line_end = text.find('\n', content_start)
+    close = text.find(FENCE, content_start)
+    if line_end == -1 or close != -1 and close < line_end:
+        # a fence on a single line, like ```{"a": 1}```
+        language = ''
+    else:
+        language = text[content_start:line_end].strip().lower()
+        content_start = line_end + 1
+        close = text.find(FENCE, content_start)
+    content_end = len(text) if close == -1 else close
+    block_end = len(text) if close == -1 else close + len(FENCE)
+
+    span_start, span_end = _strip(text, content_start, content_end)
+    if language not in JSON_FENCE_LANGUAGES or span_start == span_end:
+        return None, block_end
+    if language == '' and text[span_start] not in '{[':
+        # an unlabeled code block with something else than JSON
+        return None, block_end
+    return (span_start, span_end), block_end
+
+
+def find_json(text: str):
+    # Returns a list with a tuple (start, end) for every span of JSON in the text, in order
+    pattern = compiled_pattern(start_of_span)
+    spans = []
+    index = 0
+    while True:
+        match = pattern.search(text, index)
+        if match is None:
+            return spans
+        start = match.start()
+        if text.startswith(FENCE, start):
+            span, index = _fence_span(text, start)
+            if span is not None:
+                spans.append(span)
+        elif _looks_like_json(text, start):
+            index = skip_value(text, start)
+            spans.append(_strip(text, start, index))
+        else:
+            index = start + 1
+
+
+def extract_and_fix(text: str, output_format='preserve'):
+    # Returns a list with a tuple (start, end, repaired) for every span of JSON in the text
+    # which can be repaired
+    results = []
+    for start, end in find_json(text):
+        try:
+            results.append((start, end, fix_json(text[start:end], output_format=output_format)))
+        except JSONFixError:
+            continue
+    return results
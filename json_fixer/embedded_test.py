@@ -0,0 +1,52 @@
+import unittest
+
+from json_fixer.embedded import extract_and_fix, find_json
+
+
+def spans(text):
+    return [text[start:end] for start, end in find_json(text)]
+
+
+class TestFindJSON(unittest.TestCase):
+    def test_should_find_fenced_json(self):
+        text = 'Here is the result:\n```json\n{"a": [1, 2,]}\n```\nAnything else?'
+        self.assertEqual(spans(text), ['{"a": [1, 2,]}'])
+        self.assertEqual(spans('```JSON\n[1]\n``` and ```\n{"b": 2}\n``` and ```{"c": 3}```'),
+                         ['[1]', '{"b": 2}', '{"c": 3}'])
+
+    def test_should_skip_other_code_blocks(self):
+        self.assertEqual(spans('```python\nx = {"a": 1}\n```\n```\nplain [text]\n```\n{"b": 2}'), ['{"b": 2}'])
+
+    def test_should_find_json_in_prose_and_logs(self):
+        text = ('2024-05-01T10:00:00Z INFO [worker] got {"id": 1, "text": "a } b"} in 3 ms\n'
+                "2024-05-01T10:00:01Z WARN {id: 2, tags: ['x'], /* } */ n: 1} see [citation needed] {see below}")
+        self.assertEqual(spans(text), ['{"id": 1, "text": "a } b"}', "{id: 2, tags: ['x'], /* } */ n: 1}"])
+        self.assertEqual(spans('values [1, 2] and [true] and [{"a": 1}]'), ['[1, 2]', '[true]', '[{"a": 1}]'])
+        self.assertEqual(spans('note {“a”: “b} c”} and [‘x]’]'), ['{“a”: “b} c”}', '[‘x]’]'])
+
+    def test_should_find_truncated_json(self):
+        self.assertEqual(spans('Result: {"a": [1, 2'), ['{"a": [1, 2'])
+        self.assertEqual(spans('```json\n{"a": 1,\n'), ['{"a": 1,'])
+
+    def test_should_find_nothing_in_plain_text(self):
+        for text in ['', 'no json here', '{see below} and [note]', '```\n```', '```json\n```']:
+            self.assertEqual(find_json(text), [], text)
+
+
+class TestExtractAndFix(unittest.TestCase):
+    def test_should_repair_every_span(self):
+        text = "Answer:\n```json\n{name: 'John', tags: [a, b,]}\n```\nand also [1, 2 3] and {\"a\": "
+        results = extract_and_fix(text)
+        self.assertEqual([(text[start:end], repaired) for start, end, repaired in results], [
+            ("{name: 'John', tags: [a, b,]}", '{"name": "John", "tags": ["a", "b"]}'),
+            ('[1, 2 3]', '[1, 2, 3]'),
+            ('{"a":', '{"a":null}'),
+        ])
+        self.assertEqual(extract_and_fix('{"a": [1, 2]}', output_format='minified'), [(0, 13, '{"a":[1,2]}')])
+
+    def test_should_skip_spans_that_cannot_be_repaired(self):
+        self.assertEqual(extract_and_fix('{"a" @} and [1]'), [(12, 15, '[1]')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,354 @@
+# Extract and repair only some values out of a large, possibly broken document, like
+# $.choices[0].message.tool_calls, instead of repairing all of it.
+#
+# The document is walked once along the requested paths. Subtrees that no path leads into are
+# skipped with the output-free scanner, and only the matching values are repaired by fix_json.
+# A skipped subtree which is not valid JSON is walked too, since fix_json may close it before
+# its closing bracket. When the walker cannot tell the structure of the document for sure, like
+# for newline delimited JSON, a JSONP call, escaped quotes or a missing item, the whole document
+# is repaired first and the repaired text is walked instead.
+from .diagnose import is_valid_json
+from .fixer import JSONFixError, fix_json
+from .scanner import skip_separators, skip_string, skip_value
+from .utils import is_delimiter, is_digit, is_non_zero_digit, is_quote, is_start_of_value, is_whitespace
+
+keywords = ('true', 'false', 'null', 'True', 'False', 'None')
+
+
+class _CannotWalk(Exception):
+    pass
+
+
+def parse_path(path: str):
+    # Returns the steps of a path like $.choices[0].message or $['key'][1]: strings for the
+    # keys of objects and ints for the indexes of arrays
+    if not path.startswith('$'):
+        raise ValueError(f'Invalid path {path!r}, expected a path starting with $')
+    steps = []
+    index = 1
+    while index < len(path):
+        char = path[index]
+        if char == '.':
+            end = index + 1
+            while end < len(path) and path[end] not in '.[':
+                end += 1
+            if end == index + 1:
+                raise ValueError(f'Invalid path {path!r}, expected a key at position {index + 1}')
+            steps.append(path[index + 1:end])
+        elif char == '[':
+            end = path.find(']', index)
+            if end == -1:
+                raise ValueError(f'Invalid path {path!r}, expected ] after position {index}')
+            selector = path[index + 1:end]
+            if len(selector) >= 2 and selector[0] == selector[-1] and selector[0] in '"\'':
+                steps.append(selector[1:-1])
+            elif selector.isdigit():
+                steps.append(int(selector))
+            else:
+                raise ValueError(f'Invalid path {path!r}, expected an index or quoted key at position {index + 1}')
+            end += 1
+        else:
+            raise ValueError(f'Invalid path {path!r}, unexpected character {char!r} at position {index}')
+        index = end
+    return tuple(steps)
+
+
+def build_path_tree(paths):
+    # Merges the paths into a tree of nested dicts keyed by step. The key None of a node lists
+    # the paths which end at that node
+    tree = {}
+    for path in paths:
+        node = tree
+        for step in parse_path(path):
+            node = node.setdefault(step, {})
+        node.setdefault(None, []).append(path)
+    return tree
+
+
+def _end_of_digits(text: str, index: int):
+    while index < len(text) and is_digit(ord(text[index])):
+        index += 1
+    return index
+
+
+def _expect_digit(text: str, index: int):
+    # like the parser of fix_json, which completes a number cut off at the end of the text,
+    # and raises an error when another character follows
+    if index < len(text) and not is_digit(ord(text[index])):
+        raise _CannotWalk()
+    return index < len(text)
+
+
+def _end_of_number(text: str, start: int):
+    # returns the end of the number at text[start], or start when it is no number
+    index = start
+    if text[index] == '-':
+        index += 1
+        if not _expect_digit(text, index):
+            return index
+    if index < len(text) and text[index] == '0':
+        index += 1
+        if index < len(text) and is_digit(ord(text[index])):
+            # fix_json splits a leading zero off into a value of its own
+            raise _CannotWalk()
+    elif index < len(text) and is_non_zero_digit(ord(text[index])):
+        index = _end_of_digits(text, index + 1)
+    if index < len(text) and text[index] == '.':
+        index += 1
+        if not _expect_digit(text, index):
+            return index
+        index = _end_of_digits(text, index)
+    if index < len(text) and text[index] in 'eE':
+        index += 1
+        if index < len(text) and text[index] in '+-':
+            index += 1
+        if not _expect_digit(text, index):
+            return index
+        index = _end_of_digits(text, index)
+    return index
+
+
+def _check_concatenation(text: str, end: int):
+    # fix_json concatenates strings like "a" + "b"
+    following = skip_separators(text, end, commas=False)
+    if following < len(text) and text[following] == '+':
+        raise _CannotWalk()
+
+
+def _end_of_scalar(text: str, start: int, strict: bool):
+    # Returns the end of the value at text[start] which is not an object or array, like
+    # the parser of fix_json: a string ends at its end quote, anything else at a delimiter
+    char = text[start]
+    if is_quote(ord(char)):
+        end = skip_string(text, start)
+        _check_concatenation(text, end)
+        return end
+    if char == '\\':
+        # an escaped string
+        raise _CannotWalk()
+
+    end = _end_of_number(text, start)
+    if end > start:
+        return end
+    for keyword in keywords:
+        if text.startswith(keyword, start):
+            return start + len(keyword)
+
+    # an unquoted string or a function call
+    end = start
+    while end < len(text) and not is_delimiter(text[end]):
+        end += 1
+    if end == start:
+        # no value, like a closing bracket where a value is expected
+        raise _CannotWalk()
+    if end < len(text) and text[end] == '(':
+        return _end_of_function_call(text, end + 1, strict)
+    while end > start and is_whitespace(ord(text[end - 1])):
+        end -= 1
+    return end
+
+
+def _end_of_function_call(text: str, index: int, strict: bool):
+    # Returns the end of a function call like NumberLong("2"), of which fix_json keeps the
+    # argument. text[index] follows the opening parenthesis
+    index = skip_separators(text, index, commas=False)
+    if index >= len(text) or text[index] == ')':
+        # fix_json leaves out a call without an argument
+        raise _CannotWalk()
+    index = skip_separators(text, _end_of_value(text, index, strict), commas=False)
+    if index >= len(text):
+        return index
+    if text[index] != ')':
+        # fix_json takes whatever follows the argument for the next value
+        raise _CannotWalk()
+    index += 1
+    if index < len(text) and text[index] == ';':
+        index += 1
+    return index
+
+
+def _end_of_value(text: str, start: int, strict: bool):
+    if text[start] == '{' or text[start] == '[':
+        end = skip_value(text, start)
+        if not strict or is_valid_json(text[start:end]):
+            return end
+        # a broken object or array, which fix_json may close before its closing bracket
+        if text[start] == '{':
+            return _walk_object(text, start, {}, [], strict)
+        return _walk_array(text, start, {}, [], strict)
+    return _end_of_scalar(text, start, strict)
+
+
+def _parse_key(text: str, start: int):
+    # returns a tuple (key, end) of the object key at text[start]
+    char = text[start]
+    if is_quote(ord(char)):
+        end = skip_string(text, start)
+        _check_concatenation(text, end)
+        key = text[start + 1:end - 1]
+        if '\\' in key or end == len(text):
+            import json
+            key = json.loads(fix_json(text[start:end]))
+        return key, end
+    if char == '\\':
+        raise _CannotWalk()
+
+    end = start
+    while end < len(text) and not is_delimiter(text[end]):
+        end += 1
+    if end == start or end < len(text) and text[end] == '(':
+        # no key, or a function call where fix_json expects a key
+        raise _CannotWalk()
+    return text[start:end].rstrip(' \t\n\r'), end
+
+
+def _skip_item_separators(text: str, index: int, first: bool):
+    # skips whitespace, comments and the comma in between the members of an object or the
+    # items of an array
+    end = skip_separators(text, index)
+    if text.count(',', index, end) > (0 if first else 1):
+        # a missing item, which fix_json repairs depending on the context
+        raise _CannotWalk()
+    return end
+
+
+def _walk_object(text: str, index: int, node: dict, found: list, strict: bool):
+    # text[index] is '{'. Returns the index after the object
+    index += 1
+    first = True
+    members = {}  # the range of found of every key on a path, to drop it for a duplicate key
+    while True:
+        index = _skip_item_separators(text, index, first)
+        first = False
+        if index >= len(text):
+            return index
+        if text[index] == '}':
+            return index + 1
+        if text[index] in ']{[':
+            # fix_json closes the object before a bracket where a key is expected
+            raise _CannotWalk()
+
+        key, index = _parse_key(text, index)
+        index = skip_separators(text, index, commas=False)
+        colon = index < len(text) and text[index] == ':'
+        if colon:
+            index = skip_separators(text, index + 1, commas=False)
+        elif index >= len(text) or not is_start_of_value(text[index]):
+            # fix_json expects a colon after the key
+            raise _CannotWalk()
+        missing = index >= len(text) or text[index] == '}'
+        if not missing and text[index] in ',:])(':
+            # a missing value in front of a comma, which can be followed by a bracket fix_json
+            # closes the object at, or no value at all
+            raise _CannotWalk()
+
+        child = node.get(key)
+        if child is None:
+            index = _end_of_value(text, index, strict) if not missing else index
+            continue
+        # the last value of a duplicate key is taken, like json.loads does
+        for position in range(*members.get(key, (0, 0))):
+            found[position] = None
+        start = len(found)
+        if missing:
+            # a missing value, which fix_json repairs with null
+            if None in child:
+                found.append((child[None], index, index))
+        else:
+            index = _walk_value(text, index, child, found, strict)
+        members[key] = (start, len(found))
+
+
+def _walk_array(text: str, index: int, node: dict, found: list, strict: bool):
+    # text[index] is '['. Returns the index after the array
+    index += 1
+    item = 0
+    while True:
+        index = _skip_item_separators(text, index, item == 0)
+        if index >= len(text):
+            return index
+        if text[index] == ']':
+            return index + 1
+        if text[index] in '}:)(':
+            # no item, fix_json closes the array before it
+            raise _CannotWalk()
+
+        child = node.get(item)
+        if child is None:
+            index = _end_of_value(text, index, strict)
+        else:
+            index = _walk_value(text, index, child, found, strict)
+        item += 1
+
+
+def _walk_value(text: str, index: int, node: dict, found: list, strict: bool):
+    # Walks the value at text[index] along the path tree, and appends a tuple (paths, start,
+    # end) to found for every value at the end of a path. Returns the index after the value
+    if None in node:
+        found.append((node[None], index, _end_of_value(text, index, strict)))
+    if text[index] == '{':
+        return _walk_object(text, index, node, found, strict)
+    if text[index] == '[':
+        return _walk_array(text, index, node, found, strict)
+    return _end_of_value(text, index, strict)
+
+
+def _find_values(text: str, tree: dict, strict: bool):
+    # Returns a list with tuples (paths, start, end) of the values at the end of the paths
+    found = []
+    start = skip_separators(text, 0)
+    if start >= len(text):
+        raise _CannotWalk()
+    if text[start] not in '{[-0123456789' and not is_quote(ord(text[start])) \
+            and not text.startswith(('true', 'false', 'null'), start):
+        # a JSONP call or an unquoted string
+        raise _CannotWalk()
+    end = _walk_value(text, start, tree, found, strict)
+    if skip_separators(text, end) < len(text):
+        # more than one root value, like newline delimited JSON
+        raise _CannotWalk()
+    return found
+
+
+def _repair_values(text: str, tree: dict, output_format, strict: bool):
+    # returns a list with tuples (paths, repaired) of the values at the end of the paths
+    # a missing value is repaired with null, and the values of duplicate keys before the last
+    # one are None
+    return [(matched_paths, fix_json(text[start:end], output_format=output_format) if end > start else 'null')
+            for matched_paths, start, end in filter(None, _find_values(text, tree, strict))]
+
+
+def fix_json_extract(text: str, paths, output_format='preserve'):
+    # Returns a dict with the repaired JSON of the value at every path in paths, like
+    # fix_json(text) would repair it, or None when the document has no value at the path.
+    # Paths are written like $.choices[0].message or $['key'][1]. When the same key occurs
+    # more than once in an object, the last value is taken, like json.loads does
+    tree = build_path_tree(paths)
+    try:
+        values = _repair_values(text, tree, output_format, True)
+    except (_CannotWalk, JSONFixError):
+        values = None
+    if values is None:
+        try:
+            repaired = fix_json(text)
+        except JSONFixError as e:
+            error = e
+            repaired = None
+        if repaired is not None:
+            values = _repair_values(repaired, tree, output_format, True)
+        else:
+            # the document cannot be repaired, but the paths may lead around the broken
+            # parts, which are skipped up to their closing bracket
+            try:
+                values = _repair_values(text, tree, output_format, False)
+            except (_CannotWalk, JSONFixError):
+                values = None
+            if values is None:
+                # raise the error with its position in the text
+                raise error
+
+    results = dict.fromkeys(paths)
+    for matched_paths, repaired in values:
+        for path in matched_paths:
+            results[path] = repaired
+    return results
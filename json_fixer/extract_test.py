@@ -0,0 +1,126 @@
+import json
+import random
+import unittest
+
+from json_fixer.extract import fix_json_extract, parse_path
+from json_fixer.fixer import JSONFixError, fix_json
+
+RESPONSE = ('{"id": "resp-1", "choices": [{"index": 0, "message": {"role": "assistant", "content": null, '
+            '"tool_calls": [{"id": "call-1", "function": {"name": "f", "arguments": "{}"}}]}}, '
+            '{"index": 1, "message": {"content": "text with ] and }"}}], "usage": {"total_tokens": 12}}')
+
+
+def value_at(document, path):
+    # returns the value at the path, or None when the document has no value there
+    value = document
+    for step in parse_path(path):
+        if isinstance(step, int) and isinstance(value, list) and step < len(value):
+            value = value[step]
+        elif isinstance(step, str) and isinstance(value, dict) and step in value:
+            value = value[step]
+        else:
+            return None
+    return value
+
+
+class TestParsePath(unittest.TestCase):
+    def test_should_parse_keys_and_indexes(self):
+        self.assertEqual(parse_path('$'), ())
+        self.assertEqual(parse_path('$.choices[0].message'), ('choices', 0, 'message'))
+        self.assertEqual(parse_path('$[\'a.b\']["c"][12]'), ('a.b', 'c', 12))
+
+    def test_should_reject_invalid_paths(self):
+        for path in ['choices', '$.', '$[a]', '$[0', '$..a', '$a', '$[-1]']:
+            with self.assertRaises(ValueError):
+                parse_path(path)
+
+
+class TestFixJSONExtract(unittest.TestCase):
+    def assertExtracts(self, text, paths):
+        # the extracted values must equal the values of the whole repaired document
+        document = json.loads(fix_json(text))
+        results = fix_json_extract(text, paths)
+        self.assertEqual(list(results), paths)
+        for path, repaired in results.items():
+            value = document
+            for step in parse_path(path):
+                value = value[step]
+            self.assertEqual(json.loads(repaired), value, path)
+
+    def test_should_extract_valid_json(self):
+        self.assertExtracts(RESPONSE, ['$.choices[0].message.tool_calls', '$.id', '$.usage', '$.choices[1]', '$'])
+        self.assertEqual(fix_json_extract(RESPONSE, ['$.usage.total_tokens']), {'$.usage.total_tokens': '12'})
+
+    def test_should_extract_from_broken_json(self):
+        text = ("// response\n{id: 'resp-1', choices: [{index: 0 message: {role: assistant, tool_calls: [{id: 'c',},]}}"
+                ", {index: 1, message: {content: \"a /* ] */\" /* } */}}], usage: {total_tokens: 12")
+        self.assertExtracts(text, ['$.choices[0].message.tool_calls', '$.id', '$.usage.total_tokens',
+                                   '$.choices[1].message.content', '$.choices[0].index'])
+
+    def test_should_extract_from_strings_in_special_quotes(self):
+        self.assertExtracts("{“a”: [‘x]’, `y, z´], 'b': {“c”: 'it’, d: 1}}", ['$.a', '$.a[1]', '$.b', '$.b.c', '$.b.d'])
+
+    def test_should_repair_only_the_extracted_values(self):
+        # the broken value of b is skipped, so it does not fail the extraction of a
+        self.assertEqual(fix_json_extract('{"a": [1, 2,], "b": {"c" @}}', ['$.a']), {'$.a': '[1, 2]'})
+
+    def test_should_return_none_for_missing_values(self):
+        self.assertEqual(fix_json_extract(RESPONSE, ['$.missing', '$.choices[5]', '$.id.x', '$.choices.x']),
+                         dict.fromkeys(['$.missing', '$.choices[5]', '$.id.x', '$.choices.x']))
+
+    def test_should_repair_missing_values_with_null(self):
+        for text in ['{"a":, "b": 2}', '{"a": /* none */ , "b": 2}', '{"b": 2, "a": }', '{"b": 2, "a":']:
+            self.assertExtracts(text, ['$.a', '$.b'])
+            self.assertEqual(fix_json_extract(text, ['$.a'])['$.a'], 'null')
+
+    def test_should_complete_numbers_only_at_the_end(self):
+        self.assertEqual(fix_json_extract('{"x": [1, 2.', ['$.x[1]']), {'$.x[1]': '2.0'})
+        for text in ['{"x": 1.}', '{"x": -, "y": 1}', '{"x": 1e }']:
+            with self.assertRaises(JSONFixError, msg=text) as cm:
+                fix_json_extract(text, ['$.x'])
+            # raised by the full repair, not while handling the error of the extraction
+            self.assertIsNone(cm.exception.__context__, text)
+
+    def test_should_take_the_last_duplicate_key(self):
+        self.assertEqual(fix_json_extract('{"a": 1, "b": 2, "a": [3]}', ['$.a']), {'$.a': '[3]'})
+
+    def test_should_fall_back_to_a_full_repair(self):
+        for text in ['callback({"a": {"b": [1]}});', '{\\"a\\": {\\"b\\": [1]}}', '{"a": 1}\n{"b": 2}',
+                     '{"a": "x" + "y", "b": [1]}', '{“a”: {“b”: [1]}}']:
+            self.assertExtracts(text, ['$[0]'] if text.startswith('{"a": 1}\n') else ['$.a'])
+
+    def test_should_match_a_full_repair(self):
+        # compares the extracted values with the values of the whole repaired document, on
+        # documents where fix_json closes containers early or repairs missing values
+        texts = ['[{"a": 1 {"a": [2, ]}, "s"]', '[{"a": , {"a": [2,3]}, "s"]', '{"a": [01, {"b": "c d"}, [2]]}',
+                 '{"a": [1, {"b": 2]}, "b": 3}', '{"a": {"b": 1, "a": [2}, "b": [3]}', '[[1, 2}, {"a": 3]]']
+        rng = random.Random(1)
+        atoms = ['{', '}', '[', ']', ',', ':', ' ', '"a"', '"b"', 'a', '1', '01', '2.', 'true', '"c d"', '/* c */']
+        for _ in range(500):
+            texts.append(''.join(rng.choice(atoms) for _ in range(rng.randint(1, 16))))
+        paths = ['$', '$.a', '$.b', '$.a.b', '$.a[1]', '$[0]', '$[1]', '$[2]', '$[1].a', '$[0].a[1]']
+        for text in texts:
+            try:
+                document = json.loads(fix_json(text))
+            except (JSONFixError, ValueError):
+                continue
+            results = fix_json_extract(text, paths)
+            for path in paths:
+                repaired = results[path]
+                self.assertEqual(None if repaired is None else json.loads(repaired), value_at(document, path),
+                                 (text, path))
+
+    def test_should_apply_the_output_format(self):
+        self.assertEqual(fix_json_extract(RESPONSE, ['$.usage'], output_format='minified'),
+                         {'$.usage': '{"total_tokens":12}'})
+
+    def test_should_raise_for_unfixable_documents(self):
+        with self.assertRaises(JSONFixError) as cm:
+            fix_json_extract('{"a": {"b" @}}', ['$.a'])
+        self.assertEqual(cm.exception.position, 11)
+        with self.assertRaises(JSONFixError):
+            fix_json_extract('{"a" , "b": 2}', ['$.b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
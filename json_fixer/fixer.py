@@ -1,5 +1,4 @@
-import json
-import re
+from types import MappingProxyType
 
 from .utils import (
     codeAsterisk,
@@ -23,7 +22,6 @@ from .utils import (
     codeUppercaseE,
     codeZero,
     ends_with_comma_or_newline,
-    insert_before_last_whitespace,
     is_control_character,
     is_delimiter,
     is_digit,
@@ -37,26 +35,37 @@ from .utils import (
     is_start_of_value,
     is_valid_string_character,
     is_whitespace,
-    strip_last_occurrence,
-    remove_at_index,
+    is_whitespace_chunk,
 )
+from .offsets import OffsetTrackingList
 
 
 class JSONFixError(Exception):
-    def __init__(self, message, position):
+    def __init__(self, message, position, code=None, span=None):
         super().__init__(f"{message} at position {position}")
+        self.message = message
         self.position = position
+        # machine-readable kind of the error, like 'colon_expected'
+        self.code = code
+        # (start, end) of the input affected by the error. In recover mode this is the
+        # part of the input that was skipped to recover from the error
+        self.span = span if span is not None else (position, position)
 
+    def __reduce__(self):
+        return self.__class__, (self.message, self.position, self.code, self.span)
 
-control_characters = {
+
+# The tables below are read-only, fix_json keeps no mutable state outside of a call
+
+control_characters = MappingProxyType({
     '\b': '\\b',
     '\f': '\\f',
     '\n': '\\n',
     '\r': '\\r',
     '\t': '\\t'
-}
+})
 
-escape_characters = {
+escape_characters = MappingProxyType({
     '"': '"',
     '\\': '\\',
     '/': '/',
@@ -65,22 +74,161 @@ escape_characters = {
     'n': '\n',
     'r': '\r',
     't': '\t'
-}
+})
+
+# escape sequences used when quoting a string, matching the output of json.dumps
+quote_characters = MappingProxyType({
+    '"': '\\"',
+    '\\': '\\\\',
+    **control_characters
+})
+
+
+def quote_string(text: str):
+    # Equivalent of json.dumps(text), without the encoder round trip. Symbols that need no
+    # escaping (by far the most common case) are checked and copied with C-level str methods
+    if text.isascii() and text.isprintable() and '"' not in text and '\\' not in text:
+        return '"' + text + '"'
+
+    # copy the safe spans in between the characters that must be escaped
+    chunks = ['"']
+    start = 0
+    for index, char in enumerate(text):
+        escaped = quote_characters.get(char)
+        if escaped is None:
+            code = ord(char)
+            if 0x20 <= code < 0x7f:
+                continue
+            if code > 0xffff:
+                # encode as a UTF-16 surrogate pair
+                code -= 0x10000
+                escaped = '\\u{0:04x}\\u{1:04x}'.format(0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+            else:
+                escaped = '\\u{0:04x}'.format(code)
+        chunks.append(text[start:index])
+        chunks.append(escaped)
+        start = index + 1
+    chunks.append(text[start:])
+    chunks.append('"')
+    return ''.join(chunks)
+
+
+def parse_output_format(output_format):
+    # returns a tuple (preserve, indent)
+    if output_format == 'preserve':
+        return True, None
+    if output_format == 'minified':
+        return False, None
+    if isinstance(output_format, dict) and set(output_format) == {'indent'}:
+        indent = output_format['indent']
+        if isinstance(indent, int) and not isinstance(indent, bool) and indent >= 0:
+            return False, indent
+    raise ValueError(f"Invalid output_format {output_format!r}, expected 'preserve', 'minified' or {{'indent': n}}")
+
+
+# Repairs which can be turned off with the profile of fix_json. Missing or trailing commas,
+# colons, quotes and brackets, missing values and truncated numbers are always repaired
+REPAIRS = (
+    'comments',  # block and line comments
+    'concatenation',  # concatenated strings like "a" + "b"
+    'escaped_strings',  # stringified JSON like {\"a\": 1}
+    'jsonp',  # JSONP function calls like callback({...});
+    'mongo',  # MongoDB function calls like NumberLong("2")
+    'ndjson',  # newline delimited JSON
+    'python_constants',  # True, False and None
+    'special_quotes',  # single quotes and typographic quotes
+    'special_whitespace',  # non-breaking and other special spaces
+    'unquoted_strings',  # unquoted keys and strings, and undefined
+)
+
 
+# Kinds of repairs reported by fix_json_reporting and diagnose: the optional REPAIRS, and the
+# structural repairs which are always made
+REPAIR_KINDS = REPAIRS + (
+    'missing_bracket',
+    'missing_colon',
+    'missing_comma',
+    'missing_quote',
+    'missing_value',
+    'string_escapes',  # invalid escape characters, unescaped quotes and control characters
+    'trailing_comma',
+    'truncated_number',
+)
 
-def fix_json(text):
+
+def parse_profile(profile):
+    # returns the set of enabled repairs
+    if profile is None:
+        return frozenset(REPAIRS)
+    repairs = frozenset(profile) if not isinstance(profile, str) else frozenset([profile])
+    unknown = repairs.difference(REPAIRS)
+    if unknown:
+        raise ValueError(f'Unknown repairs {sorted(unknown)!r} in profile, expected any of {list(REPAIRS)!r}')
+    return repairs
+
+
+def fix_json(text, recover=False, output_format='preserve', offset_map=None, profile=None, unwrap=0):
+    # With recover=True, errors that cannot be fixed do not raise a JSONFixError: the invalid
+    # object member or array item is skipped up to the next comma or closing bracket, and the
+    # error is recorded. Returns a tuple (output, errors) in that case.
+    #
+    # output_format 'preserve' copies the whitespace of the input, 'minified' leaves out all
+    # whitespace, and {'indent': n} formats the output like json.dumps(..., indent=n)
+    #
+    # When an OffsetMap is passed as offset_map, it is filled with the segments of the output
+    # that were taken from the input, to map positions between both
+    #
+    # profile is an iterable with the names of the REPAIRS to enable, all of them by default.
+    # The checks for the other repairs are left out of the parser
+    #
+    # With unwrap=n, string values containing stringified JSON, like {"a": "{\\"b\\": 1}"}, are
+    # replaced with the repaired JSON, up to n levels deep
+    return _fix_json(text, recover, output_format, offset_map, profile, unwrap, _ignore_repair)
+
+
+def fix_json_reporting(text, applied_repairs: set):
+    # fix_json(text) with the default options, which adds the REPAIR_KINDS of the repairs it
+    # makes to applied_repairs, including the repairs made before it raises a JSONFixError
+    return _fix_json(text, False, 'preserve', None, None, 0, applied_repairs.add)
+
+
+def _ignore_repair(kind: str):
+    pass
+
+
+def _fix_json(text, recover, output_format, offset_map, profile, unwrap, add_repair):
+    # The parser of fix_json, which calls add_repair with the kind of every repair it makes
+    preserve, indent = parse_output_format(output_format)
+    repairs = parse_profile(profile)
+    if not isinstance(unwrap, int) or isinstance(unwrap, bool) or unwrap < 0:
+        raise ValueError(f'Invalid unwrap {unwrap!r}, expected a number of levels >= 0')
+    repair_escaped_strings = 'escaped_strings' in repairs
+    repair_jsonp = 'jsonp' in repairs
+    repair_mongo = 'mongo' in repairs
+    repair_unquoted_strings = 'unquoted_strings' in repairs
+    is_string_quote = is_quote if 'special_quotes' in repairs else is_double_quote
     i = 0  # current index in text
-    output = ''  # generated output
+    output = []  # generated output, as a list of chunks
+    origins = None  # input offsets of the output chunks, when building an offset map
+    if offset_map is not None:
+        output = OffsetTrackingList()
+        origins = output.origins
+    errors = []  # errors recovered from when recover=True
+    depth = 0  # nesting level of objects and arrays, used for indentation
+    # when the whitespace is not copied to the output: the length of the output after the last
+    # skipped newline, where the output would end with the newline when preserving whitespace
+    newline_mark = -1
 
     def parse_value():
-        nonlocal i, output
+        nonlocal i
         parse_whitespace_and_skip_comments()
-        processed = parse_object() or parse_array() or parse_string() or parse_number() or parse_keywords() or parse_unquoted_string()
+        processed = parse_object() or parse_array() or parse_string_value() or parse_number() or parse_keywords() \
+            or parse_unquoted_string()
         parse_whitespace_and_skip_comments()
         return processed
 
     def parse_whitespace_and_skip_comments():
-        nonlocal i, output
+        nonlocal i
         start = i
         parse_whitespace()
         changed = parse_comment()
@@ -93,7 +241,24 @@ def fix_json(text):
         return i > start
 
     def parse_whitespace():
-        nonlocal i, output
+        nonlocal i, newline_mark
+        if not preserve:
+            # skip the whitespace: the output is minified or indented
+            start = i
+            while i < len(text):
+                code = ord(text[i])
+                if is_special_whitespace(code):
+                    add_repair('special_whitespace')
+                elif not is_whitespace(code):
+                    break
+                i += 1
+            if i == start:
+                return False
+            if text.find('\n', start, i) != -1:
+                newline_mark = len(output)
+            return True
+
+        start = i
         whitespace = ''
         while i < len(text) and (is_whitespace(ord(text[i])) or is_special_whitespace(ord(text[i]))):
             if i < len(text) and is_whitespace(ord(text[i])):
@@ -101,34 +266,58 @@ def fix_json(text):
             else:
                 # repair special whitespace
                 whitespace += ' '
+                add_repair('special_whitespace')
             i += 1
         if len(whitespace) > 0:
-            output += whitespace
+            output.append(whitespace)
+            if origins is not None:
+                origins[-1] = start
             return True
         return False
 
+    # parse_whitespace without the repair of special whitespace
+    def parse_plain_whitespace():
+        nonlocal i, newline_mark
+        start = i
+        while i < len(text) and is_whitespace(ord(text[i])):
+            i += 1
+        if i == start:
+            return False
+        if preserve:
+            output.append(text[start:i])
+            if origins is not None:
+                origins[-1] = start
+        elif text.find('\n', start, i) != -1:
+            newline_mark = len(output)
+        return True
+
     def parse_comment():
         nonlocal i
         # find a block comment '/* ... */'
-        if i < len(text) and ord(text[i]) == codeSlash and ord(text[i + 1]) == codeAsterisk:
-            # repair block comment by skipping it
+        if i + 1 < len(text) and ord(text[i]) == codeSlash and ord(text[i + 1]) == codeAsterisk:
+            # repair block comment by skipping it. A comment which is not closed runs until
+            # the end of the text
+            add_repair('comments')
             while i < len(text) and not at_end_of_block_comment(text, i):
                 i += 1
-            i += 2
+            i = min(i + 2, len(text))
             return True
 
         # find a line comment '// ...'
-        if i < len(text) and ord(text[i]) == codeSlash and ord(text[i + 1]) == codeSlash:
+        if i + 1 < len(text) and ord(text[i]) == codeSlash and ord(text[i + 1]) == codeSlash:
             # repair line comment by skipping it
+            add_repair('comments')
             while i < len(text) and ord(text[i]) != codeNewline:
                 i += 1
             return True
         return False
 
     def parse_character(code: int):
-        nonlocal i, output
+        nonlocal i
         if i < len(text) and ord(text[i]) == code:
-            output += text[i]
+            output.append(text[i])
+            if origins is not None:
+                origins[-1] = i
             i += 1
             return True
         return False
@@ -143,94 +332,206 @@ def fix_json(text):
     def skip_escape_character():
         return skip_character(codeBackslash)
 
+    # Insert a repaired comma, colon or bracket. When preserving whitespace, it is inserted
+    # before the trailing whitespace. Otherwise, the output never ends with whitespace.
+    # Returns the index of the repair in the output
+    def insert_repair(text_to_insert: str):
+        nonlocal newline_mark
+        if preserve:
+            return insert_before_last_whitespace(text_to_insert)
+        if newline_mark == len(output):
+            # the repair goes before the skipped newline
+            newline_mark += 1
+        output.append(text_to_insert)
+        return len(output) - 1
+
+    # The output is a list of chunks, so that repairs near the end of the output do not copy it.
+    # Whitespace, commas and quotes are always separate chunks.
+
+    def insert_before_last_whitespace(text_to_insert: str):
+        index = len(output)
+        while index > 0 and is_whitespace_chunk(output[index - 1]):
+            index -= 1
+        output.insert(index, text_to_insert)
+        return index
+
+    # Remove the last chunk which is not whitespace when it equals `chunk`,
+    # and optionally all chunks after it. Returns whether it was removed
+    def strip_last_chunk(chunk: str, strip_remaining_chunks: bool = False):
+        nonlocal newline_mark
+        index = len(output) - 1
+        while index >= 0 and is_whitespace_chunk(output[index]):
+            index -= 1
+        if index < 0 or output[index] != chunk:
+            return False
+        if strip_remaining_chunks:
+            del output[index:]
+            if newline_mark > index:
+                # a skipped newline is removed along with the chunks after it
+                newline_mark = -1
+        else:
+            del output[index]
+            if newline_mark > index:
+                newline_mark -= 1
+        return True
+
+    def output_ends_with_comma_or_newline():
+        index = len(output) - 1
+        while index >= 0 and is_whitespace_chunk(output[index]) and '\n' not in output[index]:
+            index -= 1
+        return index >= 0 and ends_with_comma_or_newline(output[index])
+
+    def newline():
+        return '\n' + ' ' * (indent * depth)
+
+    def open_bracket(bracket: str):
+        nonlocal i, depth
+        output.append(bracket)
+        if origins is not None:
+            origins[-1] = i
+        i += 1
+        depth += 1
+
+    def close_bracket(opening: str, closing: str, insert: bool):
+        nonlocal i, depth, newline_mark
+        depth -= 1
+        skipped_newline = newline_mark == len(output)
+        if indent is not None and output[-1] != opening:
+            output.append(newline())
+        if insert:
+            if skipped_newline:
+                # the indentation of the missing bracket goes before the skipped newline as well
+                newline_mark = len(output)
+            insert_repair(closing)
+            add_repair('missing_bracket')
+        else:
+            output.append(closing)
+            if origins is not None:
+                origins[-1] = i
+            i += 1
+
     # Parse an object like '{"key": "value"}'
     def parse_object():
-        nonlocal i, output
+        nonlocal i
         if i < len(text) and ord(text[i]) == codeOpeningBrace:
-            output += '{'
-            i += 1
+            open_bracket('{')
             parse_whitespace_and_skip_comments()
 
             initial = True
             while i < len(text) and ord(text[i]) != codeClosingBrace:
-                processed_comma = False
-                if not initial:
-                    processed_comma = parse_character(codeComma)
-                    if not processed_comma:
-                        # repair missing comma
-                        output = insert_before_last_whitespace(output, ',')
-                    parse_whitespace_and_skip_comments()
-                else:
-                    processed_comma = True
-                    initial = False
-
-                processed_key = parse_string() or parse_unquoted_string()
-                if not processed_key:
-                    if i < len(text) and (ord(text[i]) in [codeClosingBrace, codeOpeningBrace, codeClosingBracket,
-                                                           codeOpeningBracket]) or (i >= len(text)):
-
-                        # repair trailing comma
-                        output = strip_last_occurrence(output, ',')
-                    else:
-                        raise JSONFixError('Object key expected', i)
-                    break
-
-                parse_whitespace_and_skip_comments()
-                processed_colon = parse_character(codeColon)
-                if not processed_colon:
-                    if i < len(text) and is_start_of_value(text[i]):
-                        # repair missing colon
-                        output = insert_before_last_whitespace(output, ':')
+                member_start = i
+                mark = len(output)
+                comma_index = -1
+                was_initial = initial
+                try:
+                    processed_comma = False
+                    if not initial:
+                        processed_comma = parse_character(codeComma)
+                        if not processed_comma:
+                            # repair missing comma
+                            comma_index = insert_repair(',')
+                            add_repair('missing_comma')
+                        parse_whitespace_and_skip_comments()
                     else:
-                        raise JSONFixError('Colon expected', i)
+                        processed_comma = True
+                        initial = False
+
+                    key_mark = len(output)
+                    if indent is not None:
+                        output.append(newline())
+                    processed_key = parse_string() or parse_unquoted_string()
+                    if not processed_key:
+                        if i < len(text) and (ord(text[i]) in [codeClosingBrace, codeOpeningBrace, codeClosingBracket,
+                                                               codeOpeningBracket]) or (i >= len(text)):
+
+                            # repair trailing comma
+                            if indent is not None:
+                                del output[key_mark:]
+                            if strip_last_chunk(','):
+                                add_repair('trailing_comma')
+                        else:
+                            raise JSONFixError('Object key expected', i, 'object_key_expected')
+                        break
 
-                processed_value = parse_value()
-                if not processed_value:
-                    if processed_colon:
-                        # repair missing object value
-                        output += 'null'
-                    else:
-                        raise JSONFixError('Colon expected', i)
+                    parse_whitespace_and_skip_comments()
+                    processed_colon = parse_character(codeColon)
+                    if not processed_colon:
+                        if i < len(text) and is_start_of_value(text[i]):
+                            # repair missing colon
+                            insert_repair(':')
+                            add_repair('missing_colon')
+                        else:
+                            raise JSONFixError('Colon expected', i, 'colon_expected')
+                    if indent is not None:
+                        output.append(' ')
+
+                    processed_value = parse_value()
+                    if not processed_value:
+                        if processed_colon:
+                            # repair missing object value
+                            output.append('null')
+                            add_repair('missing_value')
+                        else:
+                            raise JSONFixError('Colon expected', i, 'colon_expected')
+                except JSONFixError as err:
+                    if not recover:
+                        raise
+                    recover_from_error(err, member_start, mark, comma_index)
+                    initial = was_initial
 
             if i < len(text) and ord(text[i]) == codeClosingBrace:
-                output += '}'
-                i += 1
+                close_bracket('{', '}', False)
             else:
                 # repair missing end bracket
-                output = insert_before_last_whitespace(output, '}')
+                close_bracket('{', '}', True)
             return True
         return False
 
     # Parse an array like '["item1", "item2", ...]'
     def parse_array():
-        nonlocal i, output
+        nonlocal i
         if i < len(text) and ord(text[i]) == codeOpeningBracket:
-            output += '['
-            i += 1
+            open_bracket('[')
             parse_whitespace_and_skip_comments()
 
             initial = True
             while i < len(text) and ord(text[i]) != codeClosingBracket:
-                if not initial:
-                    processed_comma = parse_character(codeComma)
-                    if not processed_comma:
-                        # repair missing comma
-                        output = insert_before_last_whitespace(output, ',')
-                else:
-                    initial = False
+                item_start = i
+                mark = len(output)
+                comma_index = -1
+                was_initial = initial
+                try:
+                    if not initial:
+                        processed_comma = parse_character(codeComma)
+                        if not processed_comma:
+                            # repair missing comma
+                            comma_index = insert_repair(',')
+                            add_repair('missing_comma')
+                    else:
+                        initial = False
 
-                processed_value = parse_value()
-                if not processed_value:
-                    # repair trailing comma
-                    output = strip_last_occurrence(output, ',')
-                    break
+                    value_mark = len(output)
+                    if indent is not None:
+                        output.append(newline())
+                    processed_value = parse_value()
+                    if not processed_value:
+                        # repair trailing comma
+                        if indent is not None:
+                            del output[value_mark:]
+                        if strip_last_chunk(','):
+                            add_repair('trailing_comma')
+                        break
+                except JSONFixError as err:
+                    if not recover:
+                        raise
+                    recover_from_error(err, item_start, mark, comma_index)
+                    initial = was_initial
 
             if i < len(text) and ord(text[i]) == codeClosingBracket:
-                output += ']'
-                i += 1
+                close_bracket('[', ']', False)
             else:
                 # repair missing closing array bracket
-                output = insert_before_last_whitespace(output, ']')
+                close_bracket('[', ']', True)
             return True
         return False
 
@@ -238,7 +539,8 @@ def fix_json(text):
     # multiple JSON objects separated by a newline character
     def parse_newline_delimited_json():
         # repair NDJSON
-        nonlocal i, output
+        nonlocal i
+        add_repair('ndjson')
         initial = True
         processed_value = True
         while processed_value:
@@ -247,96 +549,194 @@ def fix_json(text):
                 processed_comma = parse_character(codeComma)
                 if not processed_comma:
                     # repair: add missing comma
-                    output = insert_before_last_whitespace(output, ',')
+                    insert_repair(',')
+                    add_repair('missing_comma')
             else:
                 initial = False
 
-            processed_value = parse_value()
+            value_mark = len(output)
+            if indent is not None:
+                output.append('\n')
+            processed_value = parse_root_value()
 
         if not processed_value:
             # repair: remove trailing comma
-            output = strip_last_occurrence(output, ',')
+            if indent is not None:
+                del output[value_mark:]
+            if strip_last_chunk(','):
+                add_repair('trailing_comma')
 
         # repair: wrap the output inside array brackets
-        output = '[\n' + output + '\n]'
+        if preserve:
+            output.insert(0, '[\n')
+            output.append('\n]')
+        elif indent is None:
+            output.insert(0, '[')
+            output.append(']')
+        else:
+            # all newlines in the output are indentation, strings contain escaped newlines only
+            padding = ' ' * indent
+            if origins is None:
+                output[:] = ['[\n', padding, ''.join(output).replace('\n', '\n' + padding), '\n]']
+            else:
+                # indent chunk by chunk to keep the origins of the other chunks
+                for index, chunk in enumerate(output):
+                    if '\n' in chunk:
+                        output[index] = chunk.replace('\n', '\n' + padding)
+                output.insert(0, padding)
+                output.insert(0, '[\n')
+                output.append('\n]')
 
     # Parse a string enclosed by double quotes "...". Can contain escaped quotes
     # Repair strings enclosed in single quotes or special quotes
     # Repair an escaped string
-    def parse_string():
-        nonlocal i, output
-        skip_escape_chars = i < len(text) and ord(text[i]) == codeBackslash
+    def parse_string(concatenate: bool = True):
+        nonlocal i
+        skip_escape_chars = repair_escaped_strings and i < len(text) and ord(text[i]) == codeBackslash
         if skip_escape_chars:
             # repair: remove the first escape character
             i += 1
+            add_repair('escaped_strings')
             skip_escape_chars = True
 
-        if i < len(text) and is_quote(ord(text[i])):
+        if i < len(text) and is_string_quote(ord(text[i])):
             is_end_quote = i < len(text) and is_single_quote_like \
                 if is_single_quote_like(ord(text[i])) else is_double_quote \
                 if is_double_quote(ord(text[i])) else is_double_quote_like
+            if ord(text[i]) != codeDoubleQuote:
+                add_repair('special_quotes')
 
-            output += '"'
+            output.append('"')
+            if origins is not None:
+                origins[-1] = i
             i += 1
 
             while i < len(text) and not is_end_quote(ord(text[i])):
                 if i < len(text) and ord(text[i]) == codeBackslash:
+                    if i + 1 == len(text):
+                        # repair an escape character cut off at the end: remove it
+                        add_repair('string_escapes')
+                        i += 1
+                        break
                     char = text[i + 1]
                     escape_char = escape_characters.get(char)
                     if escape_char is not None:
-                        output += text[i:i + 2]
+                        output.append(text[i:i + 2])
+                        if origins is not None:
+                            origins[-1] = i
                         i += 2
                     elif char == 'u':
-                        if i < len(text) and is_hex(ord(text[i + 2])) \
+                        if i + 5 < len(text) and is_hex(ord(text[i + 2])) \
                                 and is_hex(ord(text[i + 3])) \
                                 and is_hex(ord(text[i + 4])) \
                                 and is_hex(ord(text[i + 5])):
-                            output += text[i:i + 6]
+                            output.append(text[i:i + 6])
+                            if origins is not None:
+                                origins[-1] = i
                             i += 6
                         else:
                             end_chars = i + 2
-                            while re.match(r'\w', text[end_chars]):
+                            while end_chars < len(text) and (text[end_chars].isalnum() or text[end_chars] == '_'):
                                 end_chars += 1
+                            if end_chars == len(text) and all(is_hex(ord(c)) for c in text[i + 2:]):
+                                # repair a unicode character cut off at the end: remove it
+                                add_repair('string_escapes')
+                                i = end_chars
+                                break
                             chars = text[i:end_chars]
-                            raise JSONFixError(f'Invalid unicode character "{chars}"', i)
+                            error = JSONFixError(f'Invalid unicode character "{chars}"', i,
+                                                 'invalid_unicode_character', (i, end_chars))
+                            if not recover:
+                                raise error
+                            # recover: drop the invalid escape sequence
+                            errors.append(error)
+                            i = end_chars
                     else:
                         # repair invalid escape character: remove it
-                        output += char
+                        output.append(char)
+                        add_repair('string_escapes')
+                        if origins is not None:
+                            origins[-1] = i + 1
                         i += 2
                 else:
                     char = text[i]
                     code = ord(text[i])
                     if code == codeDoubleQuote and ord(text[i - 1]) != codeBackslash:
                         # repair unescaped double quote
-                        output += '\\' + char
+                        output.append('\\' + char)
                         i += 1
+                        add_repair('string_escapes')
                     elif is_control_character(code):
                         # unescaped control character
-                        output += control_characters[char]
+                        output.append(control_characters[char])
                         i += 1
+                        add_repair('string_escapes')
                     else:
                         if not is_valid_string_character(code):
-                            raise JSONFixError('Invalid character ' + repr(char), i)
-                        output += char
+                            error = JSONFixError('Invalid character ' + repr(char), i, 'invalid_character', (i, i + 1))
+                            if not recover:
+                                raise error
+                            # recover: drop the invalid character
+                            errors.append(error)
+                        else:
+                            output.append(char)
+                            if origins is not None:
+                                origins[-1] = i
                         i += 1
                 if skip_escape_chars:
                     skip_escape_character()
-            if i < len(text) and is_quote(ord(text[i])):
+            if i < len(text) and is_string_quote(ord(text[i])):
                 if i < len(text) and ord(text[i]) != codeDoubleQuote:
                     # repair non-normalized quote
                     pass
-                output += '"'
+                output.append('"')
+                if origins is not None:
+                    origins[-1] = i
                 i += 1
             else:
                 # repair missing end quote
-                output += '"'
-            parse_concatenated_string()
+                output.append('"')
+                add_repair('missing_quote')
+            if concatenate:
+                parse_concatenated_string()
             return True
         return False
 
+    # Parse a string value, and replace it with the repaired JSON when it contains stringified
+    # JSON. The content is decoded and repaired in a nested call which unwraps the levels below,
+    # so it is parsed once more for every level
+    def parse_unwrapped_string():
+        start = len(output)
+        if not parse_string():
+            return False
+        end = len(output)
+        while is_whitespace_chunk(output[end - 1]):
+            end -= 1
+        # quick check of the first character of the content, before decoding it
+        if output[start + 1][:1] not in ('{', '[', '\\'):
+            return True
+        import json
+        content = json.loads(''.join(output[start:end])).strip()
+        if content[:1] not in ('{', '[', '"') or content[-1:] not in ('}', ']', '"'):
+            return True
+        nested_repairs = set()
+        try:
+            nested = _fix_json(content, False, output_format, None, profile, unwrap - 1, nested_repairs.add)
+        except JSONFixError:
+            return True
+        if nested[:1] not in ('{', '['):
+            # a plain string, or a stringified string which holds no JSON
+            return True
+        for kind in nested_repairs:
+            add_repair(kind)
+        if indent is not None and depth:
+            nested = nested.replace('\n', newline())
+        output[start:end] = [nested]
+        return True
+
     # Repair concatenated strings like "hello" + "world", change this into "helloworld"
     def parse_concatenated_string():
-        nonlocal i, output
+        nonlocal i
         processed = False
         parse_whitespace_and_skip_comments()
         while i < len(text) and ord(text[i]) == codePlus:
@@ -345,17 +745,22 @@ def fix_json(text):
             parse_whitespace_and_skip_comments()
 
             # repair: remove the end quote of the first string
-            output = strip_last_occurrence(output, '"', True)
+            add_repair('concatenation')
+            strip_last_chunk('"', True)
             start = len(output)
-            parse_string()
 
-            # repair: remove the start quote of the second string
-            output = remove_at_index(output, start, 1)
+            if parse_string(False):
+                # repair: remove the start quote of the second string
+                output[start] = ''
+                parse_whitespace_and_skip_comments()
+            else:
+                # not followed by a string: restore the end quote
+                output.append('"')
         return processed
 
     # Parse a number like 2.4 or 2.4e6
     def parse_number():
-        nonlocal i, output
+        nonlocal i
         start = i
         if i < len(text) and ord(text[i]) == codeMinus:
             i += 1
@@ -386,7 +791,9 @@ def fix_json(text):
                 i += 1
 
         if i > start:
-            output += text[start:i]
+            output.append(text[start:i])
+            if origins is not None:
+                origins[-1] = start
             return True
         return False
 
@@ -400,10 +807,20 @@ def fix_json(text):
             or parse_keyword('False', 'false') \
             or parse_keyword('None', 'null')
 
+    # parse_keywords without the repair of Python constants
+    def parse_json_keywords():
+        return parse_keyword('true', 'true') \
+            or parse_keyword('false', 'false') \
+            or parse_keyword('null', 'null')
+
     def parse_keyword(name: str, value: str):
-        nonlocal i, output
+        nonlocal i
         if text[i:i + len(name)] == name:
-            output += value
+            output.append(value)
+            if name != value:
+                add_repair('python_constants')
+            if origins is not None:
+                origins[-1] = i
             i += len(name)
             return True
         return False
@@ -413,16 +830,17 @@ def fix_json(text):
     # Repair a JSONP function call like callback({...});
     def parse_unquoted_string():
         # note that the symbol can end with whitespaces: we stop at the next delimiter
-        nonlocal i, output
+        nonlocal i
         start = i
         while i < len(text) and not is_delimiter(text[i]):
             i += 1
 
         if i > start:
-            if i < len(text) and ord(text[i]) == codeOpenParenthesis:
+            if i < len(text) and ord(text[i]) == codeOpenParenthesis and (repair_mongo if depth else repair_jsonp):
                 # repair a MongoDB function call like NumberLong("2")
                 # repair a JSONP function call like callback({...});
                 i += 1
+                add_repair('mongo' if depth else 'jsonp')
 
                 parse_value()
 
@@ -433,6 +851,8 @@ def fix_json(text):
                         # repair: skip semicolon after JSONP call
                         i += 1
                 return True
+            elif not repair_unquoted_strings:
+                i = start
             else:
                 # repair unquoted string
 
@@ -440,56 +860,158 @@ def fix_json(text):
                 while i - 1 < len(text) and is_whitespace(ord(text[i - 1])) and i > 0:
                     i -= 1
                 symbol = text[start:i]
-                output += 'null' if symbol == 'undefined' else json.dumps(symbol)
+                add_repair('unquoted_strings')
+                if symbol == 'undefined':
+                    output.append('null')
+                else:
+                    output.append(quote_string(symbol))
+                    if origins is not None and len(output[-1]) == len(symbol) + 2:
+                        # the symbol did not need escaping
+                        origins[-1] = (1, start, len(symbol))
                 return True
 
     def expect_digit(start: int):
         if i < len(text) and not is_digit(ord(text[i])):
             num_so_far = text[start:i]
-            raise JSONFixError(f'Invalid number "{num_so_far}", expecting a digit but got "{text[i]}"', i)
+            raise JSONFixError(f'Invalid number "{num_so_far}", expecting a digit but got "{text[i]}"', i,
+                               'invalid_number')
 
     def expect_digit_or_repair(start):
-        nonlocal i, output
+        nonlocal i
         if i >= len(text):
             # repair numbers cut off at the end
             # this will only be called when we end after a '.', '-', or 'e' and does not
             # change the number more than it needs to make it valid JSON
-            output += text[start:i] + '0'
+            output.append(text[start:i] + '0')
+            add_repair('truncated_number')
+            if origins is not None:
+                origins[-1] = (0, start, i - start)
             return True
         else:
             expect_digit(start)
             return False
 
+    def parse_root_value():
+        nonlocal i
+        start = i
+        mark = len(output)
+        try:
+            return parse_value()
+        except JSONFixError as err:
+            if not recover:
+                raise
+            # a root level value cannot be resynchronized: skip the rest of the text
+            recover_from_error(err, start, mark, -1, True)
+            return False
+
+    # Recover from an error inside an object member or array item which started at
+    # input position start and output position mark: drop its output, skip the rest of it in
+    # the input, and record the error. A comma repaired in front of it at comma_index, which
+    # may be before the trailing whitespace of the previous member or item, is dropped too
+    def recover_from_error(error: JSONFixError, start: int, mark: int, comma_index: int, skip_all: bool = False):
+        nonlocal i
+        del output[mark:]
+        if 0 <= comma_index < mark:
+            del output[comma_index]
+        if skip_all:
+            i = len(text)
+        else:
+            skip_to_delimiter()
+        error.span = (start, i)
+        # drop the traceback: it keeps the frames of the parser alive for as long as the error
+        errors.append(error.with_traceback(None))
+        if i < len(text) and ord(text[i]) == codeComma:
+            i += 1
+            parse_whitespace_and_skip_comments()
+
+    # Skip up to the next comma or closing bracket on the current level,
+    # skipping nested objects, arrays and double-quoted strings
+    def skip_to_delimiter():
+        nonlocal i
+        depth = 0
+        while i < len(text):
+            code = ord(text[i])
+            if code == codeDoubleQuote:
+                i += 1
+                while i < len(text) and ord(text[i]) != codeDoubleQuote:
+                    i += 2 if ord(text[i]) == codeBackslash else 1
+            elif code == codeOpeningBrace or code == codeOpeningBracket:
+                depth += 1
+            elif code == codeClosingBrace or code == codeClosingBracket:
+                if depth == 0:
+                    return
+                depth -= 1
+            elif code == codeComma and depth == 0:
+                return
+            i += 1
+        i = len(text)
+
+    # Equivalent of output_ends_with_comma_or_newline() when the whitespace is not copied to
+    # the output
+    def skipped_comma_or_newline():
+        return newline_mark == len(output) or len(output) > 0 and ends_with_comma_or_newline(output[-1])
+
     def at_end_of_block_comment(block_text: str, block_i: int):
-        return block_text[block_i] == '*' and block_text[block_i + 1] == '/'
+        return block_text.startswith('*/', block_i)
 
     def throw_unexpected_end():
-        raise JSONFixError('Unexpected end of json string', len(text))
+        raise JSONFixError('Unexpected end of json string', len(text), 'unexpected_end')
 
     def throw_unexpected_character():
-        raise JSONFixError('Unexpected character ' + repr(text[i]), i)
+        raise JSONFixError('Unexpected character ' + repr(text[i]), i, 'unexpected_character')
 
-    processed = parse_value()
+    def skip_repair():
+        return False
+
+    # specialize the parser for the profile: replace the functions of disabled repairs
+    if 'special_whitespace' not in repairs:
+        parse_whitespace = parse_plain_whitespace
+    if 'comments' not in repairs:
+        parse_whitespace_and_skip_comments = parse_whitespace
+    if 'concatenation' not in repairs:
+        parse_concatenated_string = skip_repair
+    if 'python_constants' not in repairs:
+        parse_keywords = parse_json_keywords
+    parse_string_value = parse_unwrapped_string if unwrap else parse_string
+
+    def join_output():
+        if offset_map is not None:
+            output.fill_offset_map(offset_map)
+        return ''.join(output)
+
+    processed = parse_root_value()
     if not processed:
-        throw_unexpected_end()
+        if not recover:
+            throw_unexpected_end()
+        if not errors:
+            errors.append(JSONFixError('Unexpected end of json string', len(text), 'unexpected_end'))
+        return join_output(), errors
 
     processed_comma = parse_character(codeComma)
     if processed_comma:
         parse_whitespace_and_skip_comments()
 
-    if i < len(text) and is_start_of_value(text[i]) and ends_with_comma_or_newline(output):
+    if 'ndjson' in repairs and i < len(text) and is_start_of_value(text[i]) and \
+            (output_ends_with_comma_or_newline() if preserve else skipped_comma_or_newline()):
         # start of a new value after end of the root level object: looks like
         # newline delimited JSON -> turn into a root level array
         if not processed_comma:
             # repair missing comma
-            output = insert_before_last_whitespace(output, ',')
+            insert_repair(',')
+            add_repair('missing_comma')
         parse_newline_delimited_json()
     elif processed_comma:
         # repair: remove trailing comma
-        output = strip_last_occurrence(output, ',')
+        strip_last_chunk(',')
+        add_repair('trailing_comma')
 
     if i >= len(text):
         # reached the end of the document properly
-        return output
+        return (join_output(), errors) if recover else join_output()
+
+    if not recover:
+        throw_unexpected_character()
 
-    throw_unexpected_character()
+    # recover: skip the remaining text
+    errors.append(JSONFixError('Unexpected character ' + repr(text[i]), i, 'unexpected_character', (i, len(text))))
+    return join_output(), errors
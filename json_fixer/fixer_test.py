@@ -1,7 +1,12 @@
+import json
 import unittest
 
 from json_fixer.fixer import JSONFixError
+from json_fixer.fixer import REPAIR_KINDS
+from json_fixer.fixer import REPAIRS
 from json_fixer.fixer import fix_json
+from json_fixer.fixer import fix_json_reporting
+from json_fixer.fixer import quote_string
 
 
 class TestJSONFixValidJSON(unittest.TestCase):
@@ -96,6 +101,9 @@ class TestJSONFixInValidJSON(unittest.TestCase):
         self.assertEqual(fix_json('"abc'), '"abc"')
         self.assertEqual(fix_json("'abc"), '"abc"')
         self.assertEqual(fix_json('\u2018abc'), '"abc"')
+        # an escape sequence cut off at the end is removed
+        self.assertEqual(fix_json('"abc\\'), '"abc"')
+        self.assertEqual(fix_json('"abc\\u00'), '"abc"')
 
     def test_should_replace_single_quotes_with_double_quotes(self):
         self.assertEqual(fix_json("{'a':2}"), '{"a":2}')
@@ -348,6 +356,13 @@ class TestJSONFixInValidJSON(unittest.TestCase):
         self.assertEqual(fix_json('a,b'), '[\n"a","b"\n]')
 
 
+class TestQuoteString(unittest.TestCase):
+    def test_should_quote_like_json_dumps(self):
+        for text in ['', 'abc', 'hello world!', 'a"b', 'a\\b', 'tab\there', 'line\nbreak\r\b\f', '\x00\x1f\x7f',
+                     'йнформация', '★', '😀', 'mixed "😀" \\ \x01 end', '\ud83d']:
+            self.assertEqual(quote_string(text), json.dumps(text))
+
+
 class TestJSONRaiseExceptionIfNonFixableIssue(unittest.TestCase):
     def test_should_throw_an_exception_in_case_of_non_fixable_issues(self):
         with self.assertRaises(JSONFixError) as cm:
@@ -411,5 +426,220 @@ class TestJSONRaiseExceptionIfNonFixableIssue(unittest.TestCase):
         self.assertEqual(cm.exception.args[0], 'Invalid unicode character "\\uZ000" at position 1')
 
 
+class TestJSONFixRecover(unittest.TestCase):
+    def assert_recover(self, text: str, expected: str, expected_errors):
+        output, errors = fix_json(text, recover=True)
+        self.assertEqual(output, expected)
+        self.assertEqual([(error.code, error.position, error.span) for error in errors], expected_errors)
+
+    def test_should_return_no_errors_for_fixable_json(self):
+        self.assert_recover('{a:2,}', '{"a":2}', [])
+
+    def test_should_skip_invalid_object_members(self):
+        self.assert_recover('{"a":1,,"b":2}', '{"a":1,"b":2}', [('object_key_expected', 7, (6, 7))])
+        self.assert_recover('{"a": 1, "b" @, "c": 3}', '{"a": 1, "c": 3}', [('colon_expected', 13, (7, 14))])
+        self.assert_recover('{"a" @ "x,y" {,}, "b": 1}', '{ "b": 1}', [('colon_expected', 5, (1, 16))])
+
+    def test_should_drop_a_repaired_comma_with_the_skipped_member(self):
+        # the missing comma is inserted before the whitespace of the previous member or item
+        self.assert_recover('{"a":1, "b" 2 3, "c":3}', '{"a":1, "b": 2, "c":3}', [('colon_expected', 15, (14, 15))])
+        self.assert_recover('[1, {"a" 2 3}, 4]', '[1, {"a": 2}, 4]', [('colon_expected', 12, (11, 12))])
+        for text in ['{"a":1, "b" 2 3, "c":3}', '[1, {"a" 2 3}, 4]', '[1 \n {"a" @}, 2]', '{"a": 1  "b" @ }']:
+            for output_format in ['preserve', 'minified', {'indent': 2}]:
+                output, errors = fix_json(text, recover=True, output_format=output_format)
+                json.loads(output)
+
+    def test_should_skip_invalid_array_items(self):
+        self.assert_recover('[1, -x, 3]', '[1, 3]', [('invalid_number', 5, (2, 6))])
+        self.assert_recover('[-,3]', '[3]', [('invalid_number', 2, (1, 2))])
+
+    def test_should_collect_all_errors(self):
+        self.assert_recover(
+            '{"a": [1, 2e, {"x": "\\uZZ"}, -y], "b": true}',
+            '{"a": [1, {"x": ""}], "b": true}',
+            [('invalid_number', 12, (8, 12)), ('invalid_unicode_character', 21, (21, 25)),
+             ('invalid_number', 30, (27, 31))]
+        )
+
+    def test_should_drop_invalid_string_characters(self):
+        self.assert_recover('"\\u26 x"', '" x"', [('invalid_unicode_character', 1, (1, 5))])
+        self.assert_recover('"a\x01b"', '"ab"', [('invalid_character', 2, (2, 3))])
+
+    def test_should_skip_invalid_newline_delimited_values(self):
+        self.assert_recover('{"a":1}\n{"b": -q}\n{"c":3}', '[\n{"a":1},\n{},\n{"c":3}\n]',
+                            [('invalid_number', 15, (9, 16))])
+
+    def test_should_skip_unexpected_trailing_characters(self):
+        self.assert_recover('foo [', '"foo" ', [('unexpected_character', 4, (4, 5))])
+        self.assert_recover('', '', [('unexpected_end', 0, (0, 0))])
+
+    def test_should_repair_truncated_input(self):
+        self.assert_recover('{"a": "x\\', '{"a": "x"}', [])
+        self.assert_recover('["a\\u00', '["a"]', [])
+        self.assert_recover('[1, /', '[1, "/"]', [])
+        self.assert_recover('[1 /*x*', '[1] ', [])
+        self.assert_recover('[1 /*x', '[1] ', [])
+        self.assert_recover('[1 //x', '[1] ', [])
+
+    def test_should_not_raise_other_errors_on_truncated_input(self):
+        text = '{"a": [1, 2.5e3, "b\\n\\u00e9", /* c */ true, null], // d\n "e": {\'f\': [`g`, NumberLong("1")]}}'
+        for end in range(len(text) + 1):
+            output, errors = fix_json(text[:end], recover=True)
+            self.assertIsInstance(output, str, text[:end])
+
+
+class TestJSONFixOutputFormat(unittest.TestCase):
+    def test_should_preserve_whitespace_by_default(self):
+        self.assertEqual(fix_json('{ a : 1 }', output_format='preserve'), '{ "a" : 1 }')
+
+    def test_should_minify(self):
+        self.assertEqual(fix_json('  { \n } \t ', output_format='minified'), '{}')
+        self.assertEqual(fix_json("{\n  name: 'John',\n  tags: [a, b,]\n}", output_format='minified'),
+                         '{"name":"John","tags":["a","b"]}')
+        self.assertEqual(fix_json('{"array": [\n{}\n{}\n]}', output_format='minified'), '{"array":[{},{}]}')
+        self.assertEqual(fix_json('{"a" "b"', output_format='minified'), '{"a":"b"}')
+        self.assertEqual(fix_json('"hello" +\n " world"', output_format='minified'), '"hello world"')
+        self.assertEqual(fix_json('{greeting: hello world}', output_format='minified'), '{"greeting":"hello world"}')
+
+    def test_should_minify_newline_delimited_json(self):
+        self.assertEqual(fix_json('/* 1 */\n{}\n\n/* 2 */\n{"a": [1]}\n', output_format='minified'), '[{},{"a":[1]}]')
+        self.assertEqual(fix_json('1,2,3,', output_format='minified'), '[1,2,3]')
+        self.assertEqual(fix_json('1 /* 2 */ \n 2', output_format='minified'), '[1,2]')
+
+    def test_should_detect_newline_delimited_json_like_when_preserving_whitespace(self):
+        # the newline is inside of the parentheses of a JSONP or Mongo call, or in front of a
+        # repaired closing bracket, or removed along with a broken concatenation
+        for text in ['NumberLong(T\n)undefined', 'cb(null//c\n)a{', '{"a":1\n{"b":2}', '"a"+\n{"b": 1}',
+                     '[1] /* c */\n [2]']:
+            try:
+                expected = json.loads(fix_json(text))
+            except JSONFixError:
+                expected = None
+            for output_format in ['minified', {'indent': 2}]:
+                try:
+                    value = json.loads(fix_json(text, output_format=output_format))
+                except JSONFixError:
+                    value = None
+                self.assertEqual(value, expected, (text, output_format))
+        self.assertEqual(fix_json('NumberLong(T\n)undefined', output_format='minified'), '["T",null]')
+        self.assertEqual(fix_json('cb(null//c\n)a{', output_format={'indent': 2}), '[\n  null,\n  "a",\n  {}\n]')
+
+    def test_should_indent(self):
+        self.assertEqual(fix_json('{"a": [1, {"b": {}}, []], c: {d: [x, y,],},', output_format={'indent': 2}),
+                         '{\n  "a": [\n    1,\n    {\n      "b": {}\n    },\n    []\n  ],\n'
+                         '  "c": {\n    "d": [\n      "x",\n      "y"\n    ]\n  }\n}')
+        self.assertEqual(fix_json('[1 2', output_format={'indent': 4}), '[\n    1,\n    2\n]')
+        self.assertEqual(fix_json('{"a":', output_format={'indent': 1}), '{\n "a": null\n}')
+
+    def test_should_indent_newline_delimited_json(self):
+        self.assertEqual(fix_json('{"a": 1}\n{"b": [2]}', output_format={'indent': 2}),
+                         '[\n  {\n    "a": 1\n  },\n  {\n    "b": [\n      2\n    ]\n  }\n]')
+
+    def test_should_reject_an_invalid_format(self):
+        for output_format in ['pretty', {'indent': -1}, {'indent': '2'}, {'indent': 2, 'sort': True}]:
+            with self.assertRaises(ValueError):
+                fix_json('{}', output_format=output_format)
+
+
+class TestJSONFixProfile(unittest.TestCase):
+    # an input for every repair of the profile, with its repaired output
+    examples = {
+        'comments': ('[1, /* c */ 2 // c\n]', '[1,  2 \n]'),
+        'concatenation': ('"a" + "b"', '"ab"'),
+        'escaped_strings': ('{\\"a\\": 1}', '{"a": 1}'),
+        'jsonp': ('callback({"a": 1});', '{"a": 1}'),
+        'mongo': ('{"a": NumberLong("2")}', '{"a": "2"}'),
+        'ndjson': ('{"a": 1}\n{"b": 2}', '[\n{"a": 1},\n{"b": 2}\n]'),
+        'python_constants': ('[True, None]', '[true, null]'),
+        'special_quotes': ("{'a': “b”}", '{"a": "b"}'),
+        'special_whitespace': ('[1,\u00a02]', '[1, 2]'),
+        'unquoted_strings': ('{a: undefined}', '{"a": null}'),
+    }
+
+    def test_should_have_an_example_for_every_repair(self):
+        self.assertEqual(set(self.examples), set(REPAIRS))
+
+    def test_should_repair_with_the_repair_enabled(self):
+        for repair, (text, expected) in self.examples.items():
+            self.assertEqual(fix_json(text, profile=[repair]), expected, repair)
+            self.assertEqual(fix_json(text), expected, repair)
+
+    def test_should_not_repair_with_the_repair_disabled(self):
+        for repair, (text, expected) in self.examples.items():
+            profile = [other for other in REPAIRS if other != repair]
+            try:
+                output = fix_json(text, profile=profile)
+            except JSONFixError:
+                continue
+            self.assertNotEqual(output, expected, repair)
+
+    def test_should_always_repair_structural_errors(self):
+        self.assertEqual(fix_json('{"a": [1, 2,', profile=()), '{"a": [1, 2]}')
+        self.assertEqual(fix_json('{"a": [1 2], "b" "c", "d":}', profile=()), '{"a": [1, 2], "b": "c", "d":null}')
+        self.assertEqual(fix_json('{"a": "trunc', profile=()), '{"a": "trunc"}')
+        self.assertEqual(fix_json('[1, 2.', profile=[]), '[1, 2.0]')
+
+    def test_should_reject_unknown_repairs(self):
+        with self.assertRaises(ValueError):
+            fix_json('{}', profile=['comments', 'unknown'])
+
+
+class TestJSONFixUnwrap(unittest.TestCase):
+    document = {'id': 1, 'tags': ['a', {'b': None}]}
+
+    def stringify(self, levels):
+        text = json.dumps(self.document)
+        for _ in range(levels):
+            text = json.dumps(text)
+        return text
+
+    def test_should_unwrap_nested_levels(self):
+        for levels in range(1, 4):
+            text = self.stringify(levels)
+            self.assertEqual(json.loads(fix_json(text, unwrap=levels)), self.document, levels)
+            self.assertEqual(fix_json(text, unwrap=levels - 1), fix_json(text), levels)
+
+    def test_should_unwrap_string_values(self):
+        text = json.dumps({'payload': self.stringify(1), 'list': [self.stringify(0)], 'text': 'hello'})
+        self.assertEqual(json.loads(fix_json(text, unwrap=2)),
+                         {'payload': self.document, 'list': [self.document], 'text': 'hello'})
+        self.assertEqual(fix_json('{"a": "{\\"b\\": 1}"}', unwrap=1), '{"a": {"b": 1}}')
+        self.assertEqual(fix_json('{\\"a\\": \\"{\\\\"b\\\\": 1}\\"}', unwrap=1), '{"a": {"b": 1}}')
+
+    def test_should_repair_the_unwrapped_json(self):
+        self.assertEqual(fix_json('{"a": "{b: [1, 2,], c: None}"}', unwrap=1), '{"a": {"b": [1, 2], "c": null}}')
+
+    def test_should_not_unwrap_other_strings(self):
+        for text in ['["[1] and [2]", "{x}", "\\"quoted\\"", "[truncated", "", " "]', '{"[1]": 2}']:
+            self.assertEqual(fix_json(text, unwrap=3), text)
+
+    def test_should_unwrap_with_the_output_format(self):
+        text = json.dumps({'a': json.dumps({'b': [1]})})
+        self.assertEqual(fix_json(text, unwrap=1, output_format='minified'), '{"a":{"b":[1]}}')
+        self.assertEqual(fix_json(text, unwrap=1, output_format={'indent': 2}),
+                         '{\n  "a": {\n    "b": [\n      1\n    ]\n  }\n}')
+
+    def test_should_reject_an_invalid_depth(self):
+        for unwrap in [-1, True, 1.5, None]:
+            with self.assertRaises(ValueError):
+                fix_json('{}', unwrap=unwrap)
+
+
+class TestFixJSONReporting(unittest.TestCase):
+    def test_should_report_the_repairs_made(self):
+        for text in ['{"a": "some text", \'b\': [1, 2,', '["a\\nb \\u00e9", "ü “q” \'x\'", "tab\t"]',
+                     '{\\"a\\": \\"b c\\"}', '"a" + "b"', '{"a": 1}\n{"b": "c d"}', '{"a": "trunc\\']:
+            repairs = set()
+            self.assertEqual(fix_json_reporting(text, repairs), fix_json(text), text)
+            self.assertTrue(repairs, text)
+            self.assertLessEqual(repairs, set(REPAIR_KINDS), text)
+
+    def test_should_report_the_repairs_made_before_an_error(self):
+        repairs = set()
+        with self.assertRaises(JSONFixError):
+            fix_json_reporting("{'a': [1 2,], b @}", repairs)
+        self.assertEqual(repairs, {'special_quotes', 'missing_comma', 'trailing_comma', 'unquoted_strings'})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be loaded by `import json_fixer`: they are only needed by
+# some repairs, so they are imported lazily where they are used
+DEFERRED_MODULES = {'re', 'json', 'ast'}
+
+# generous upper bound for the cumulative import time of the package, in microseconds
+IMPORT_TIME_BUDGET = 50_000
+
+
+def measure_import():
+    # -S skips the site module, so that only the imports done by the package itself are listed
+    result = subprocess.run(
+        [sys.executable, '-S', '-X', 'importtime', '-c', 'import json_fixer'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestImportTime(unittest.TestCase):
+    def test_should_not_import_deferred_modules(self):
+        modules = measure_import()
+        self.assertIn('json_fixer', modules)
+        self.assertEqual(DEFERRED_MODULES & set(modules), set())
+
+    def test_should_import_within_budget(self):
+        # take the best of a few runs to filter out noise from a busy machine
+        best = min(measure_import()['json_fixer'] for _ in range(3))
+        self.assertLess(best, IMPORT_TIME_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
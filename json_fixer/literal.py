@@ -0,0 +1,145 @@
+# Fast path for Python literals, like the repr() of a dict or list: single quoted strings,
+# True, False and None, tuples and trailing commas.
+#
+# Instead of repairing the text character by character, a single regular expression pass
+# translates the Python tokens into JSON tokens, and json.loads verifies the result: both run
+# in C, only the strings and constants go through Python code. Literals with tuples, where
+# a parenthesized value is not always a tuple, are evaluated with ast.literal_eval and
+# serialized with json.dumps instead, and so are literals with numbers as keys. Anything
+# else falls back to fix_json.
+from types import MappingProxyType
+
+from .fixer import fix_json, parse_output_format
+from .utils import compiled_pattern
+
+DEFAULT_MAX_SIZE = 10_000_000  # characters
+DEFAULT_MAX_NODES = 1_000_000
+
+constants = MappingProxyType({'True': 'true', 'False': 'false', 'None': 'null'})
+
+
+class _ContainsParentheses(Exception):
+    pass
+
+
+# strings, Python constants, trailing commas and parentheses
+python_tokens = r'''"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|\b(?:True|False|None)\b|,(?=\s*[\]}])|[()]'''
+# an escape sequence, with a group for the escaped slash which only JSON decodes
+escape_sequence = r'\\(?:(/)|.)'
+surrogate = r'[\ud800-\udfff]'
+
+
+def _keep_escaped_slash(match):
+    return match.group(1) or match.group()
+
+
+def _escape_surrogate(match):
+    return '\\u%04x' % ord(match.group())
+
+
+def _quote_python_string(token: str):
+    import ast
+    import json
+    # decode \/ like JSON does, Python keeps the backslash
+    value = ast.literal_eval(compiled_pattern(escape_sequence).sub(_keep_escaped_slash, token))
+    # combine the escaped surrogate pairs, and keep the escapes of the lone surrogates,
+    # which cannot be encoded
+    value = value.encode('utf-16-le', 'surrogatepass').decode('utf-16-le', 'surrogatepass')
+    return compiled_pattern(surrogate).sub(_escape_surrogate, json.dumps(value, ensure_ascii=False))
+
+
+def _is_json_string(token: str):
+    import json
+    try:
+        json.loads(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _translate_token(match):
+    token = match.group()
+    first = token[0]
+    if first == "'":
+        content = token[1:-1]
+        if '\\' in content or '"' in content or not content.isprintable():
+            return _quote_python_string(token)
+        return '"' + content + '"'
+    if first == '"':
+        if ('\\' in token or not token.isprintable()) and not _is_json_string(token):
+            # the escapes of JSON strings are passed through, others are Python escapes
+            return _quote_python_string(token)
+        return token
+    if first == ',':
+        # trailing comma
+        return ''
+    if first == '(' or first == ')':
+        raise _ContainsParentheses()
+    return constants[token]
+
+
+def _reject_constant(name: str):
+    # json.loads accepts NaN and Infinity, which are not valid JSON
+    raise ValueError(name)
+
+
+def _is_int_key_error(err):
+    # an object key which is a number, like {1: 'a'}
+    return err.msg.startswith('Expecting property name') and err.pos < len(err.doc) \
+        and err.doc[err.pos] in '-0123456789'
+
+
+def estimate_nodes(text: str):
+    # upper bound of the number of values in the literal, without parsing it
+    return text.count(',') + text.count(':') + text.count('[') + text.count('{') + text.count('(') + 1
+
+
+def _evaluate_python_literal(text: str, max_nodes: int):
+    # returns the value of the Python literal, or raises a ValueError or SyntaxError
+    if estimate_nodes(text) > max_nodes:
+        raise ValueError('too many nodes')
+    import ast
+    return ast.literal_eval(text.strip())
+
+
+def python_literal_to_json(text: str, output_format='preserve', max_size: int = DEFAULT_MAX_SIZE,
+                           max_nodes: int = DEFAULT_MAX_NODES):
+    # Returns the text as JSON when it is a Python literal within the budgets which can be
+    # represented in JSON, and None otherwise. Valid JSON is a Python literal as well
+    preserve, indent = parse_output_format(output_format)
+    if len(text) > max_size:
+        return None
+
+    import json
+    try:
+        try:
+            translated = compiled_pattern(python_tokens).sub(_translate_token, text)
+            value = json.loads(translated, parse_constant=_reject_constant)
+            if preserve:
+                # the translation keeps the whitespace of the input
+                return translated
+        except _ContainsParentheses:
+            value = _evaluate_python_literal(text, max_nodes)
+        except json.JSONDecodeError as err:
+            if not _is_int_key_error(err):
+                raise
+            value = _evaluate_python_literal(text, max_nodes)
+
+        if indent is not None:
+            return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=indent)
+        separators = (', ', ': ') if preserve else (',', ':')
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=separators)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        # not a literal, or values like sets, bytes, tuple keys or infinite floats
+        return None
+
+
+def fix_python_literal(text: str, output_format='preserve', max_size: int = DEFAULT_MAX_SIZE,
+                       max_nodes: int = DEFAULT_MAX_NODES):
+    # Repairs text like fix_json(text, output_format=output_format), taking the fast path for
+    # Python literals. The output of the fast path has the same value. Literals with tuples
+    # are reformatted, other literals keep the whitespace of the input
+    output = python_literal_to_json(text, output_format, max_size, max_nodes)
+    if output is not None:
+        return output
+    return fix_json(text, output_format=output_format)
@@ -0,0 +1,80 @@
+import json
+import unittest
+
+from json_fixer.fixer import JSONFixError, fix_json
+from json_fixer.literal import fix_python_literal, python_literal_to_json
+
+RECORDS = [
+    {'id': 1, 'name': "John's", 'active': True, 'parent': None, 'tags': ['a', 'b'], 'score': 1.5e-3},
+    {'id': 2, 'name': 'say "hi"', 'active': False, 'parent': 1, 'tags': [], 'score': -2},
+    {'id': 3, 'name': 'tab\tnewline\nnul\x00 é   \U0001f600 back\\slash', 'active': True, 'parent': 2},
+]
+
+
+class TestPythonLiteralToJSON(unittest.TestCase):
+    def test_should_translate_repr_output(self):
+        text = repr(RECORDS)
+        output = python_literal_to_json(text)
+        self.assertEqual(json.loads(output), RECORDS)
+        # fix_json does not decode Python escapes like \x00, compare the other records
+        text = repr(RECORDS[:2])
+        self.assertEqual(json.loads(python_literal_to_json(text)), json.loads(fix_json(text)))
+
+    def test_should_keep_the_whitespace(self):
+        self.assertEqual(python_literal_to_json(" {'a': [True, None,],\n 'b': 'c', } "),
+                         ' {"a": [true, null],\n "b": "c" } ')
+        self.assertEqual(fix_python_literal("{'a': [1, 2,]}"), fix_json("{'a': [1, 2,]}"))
+
+    def test_should_decode_python_escapes(self):
+        self.assertEqual(python_literal_to_json(r"['\x41\101\N{BULLET}\'', 'a\\/b']"),
+                         '["AA•\'", "a\\\\/b"]')
+
+    def test_should_decode_json_escapes_like_fix_json(self):
+        for text in [r'["a\/b"]', r"['a\/b', 'a\\/b']", r'["\ud83d\ude00", "\u00e9\n"]',
+                     r"['\ud83d\ude00', '\ud83d', '\ude00 \"']", r'{"\ud83d": ["\/", True]}']:
+            output = python_literal_to_json(text)
+            self.assertEqual(json.loads(output), json.loads(fix_json(text)), text)
+            # lone surrogates stay escaped, the output can be encoded
+            output.encode('utf-8')
+        self.assertEqual(python_literal_to_json(r'["a\/b", "\ud83d\ude00"]'), r'["a\/b", "\ud83d\ude00"]')
+        self.assertEqual(python_literal_to_json(r"['\ud83d\ude00', '\ud83d']"), '["\U0001f600", "\\ud83d"]')
+
+    def test_should_not_translate_tokens_inside_strings(self):
+        text = repr(['True, None', "(1, 2)", '[1,]', "'quoted'", '"double"'])
+        self.assertEqual(json.loads(python_literal_to_json(text)), ['True, None', '(1, 2)', '[1,]', "'quoted'",
+                                                                     '"double"'])
+
+    def test_should_evaluate_tuples_and_number_keys(self):
+        self.assertEqual(python_literal_to_json("{'a': (1, (2,), ()), 'b': (3)}"), '{"a": [1, [2], []], "b": 3}')
+        self.assertEqual(python_literal_to_json("{1: 'a', -2: {3: None}}"), '{"1": "a", "-2": {"3": null}}')
+
+    def test_should_apply_the_output_format(self):
+        text = "{'a': [True, None,], 'b': (1,)}"
+        self.assertEqual(python_literal_to_json("{'a': [True, None,]}", 'minified'), '{"a":[true,null]}')
+        self.assertEqual(python_literal_to_json(text, 'minified'), '{"a":[true,null],"b":[1]}')
+        self.assertEqual(python_literal_to_json(text, {'indent': 2}), fix_json(text.replace('(1,)', '[1]'),
+                                                                               output_format={'indent': 2}))
+
+    def test_should_reject_other_input(self):
+        for text in ['{"a": 1', "{'a': b}", '[1, 2] // comment', "{'a': {1, 2}}", "[b'bytes']", '[1j]',
+                     "[u'unicode']", '[NaN]', "{(1, 2): 'a'}", "['a' 'b']", "[1 + 2]", "''' a '''", '']:
+            self.assertIsNone(python_literal_to_json(text), text)
+
+    def test_should_respect_the_budgets(self):
+        text = repr(RECORDS)
+        self.assertIsNone(python_literal_to_json(text, max_size=len(text) - 1))
+        self.assertIsNotNone(python_literal_to_json(text, max_size=len(text)))
+        self.assertIsNone(python_literal_to_json('[(1, 2), (3, 4)]', max_nodes=4))
+        self.assertIsNotNone(python_literal_to_json('[(1, 2), (3, 4)]', max_nodes=10))
+
+
+class TestFixPythonLiteral(unittest.TestCase):
+    def test_should_fall_back_to_fix_json(self):
+        self.assertEqual(fix_python_literal("{'a': [1, 2"), '{"a": [1, 2]}')
+        self.assertEqual(fix_python_literal("{a: 'b'} // comment", output_format='minified'), '{"a":"b"}')
+        with self.assertRaises(JSONFixError):
+            fix_python_literal("{'a' @}")
+
+
+if __name__ == '__main__':
+    unittest.main()
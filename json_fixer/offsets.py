@@ -0,0 +1,104 @@
+# Map positions between the input of fix_json and its repaired output.
+#
+# The map is a run-length list of segments (input_offset, output_offset, length): every
+# segment is a run of output characters that were taken one to one from the input, like
+# copied values and whitespace, or characters that were replaced by one other character,
+# like single quotes and Python constants. Text inserted by a repair is not covered by a
+# segment, and neither is input that was skipped, like comments.
+from array import array
+from bisect import bisect_right
+
+
+class OffsetMap:
+    def __init__(self):
+        self.input_offsets = array('q')
+        self.output_offsets = array('q')
+        self.lengths = array('q')
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __iter__(self):
+        return zip(self.input_offsets, self.output_offsets, self.lengths)
+
+    def __repr__(self):
+        return f'OffsetMap({list(self)!r})'
+
+    def clear(self):
+        del self.input_offsets[:]
+        del self.output_offsets[:]
+        del self.lengths[:]
+
+    def add(self, input_offset: int, output_offset: int, length: int):
+        # add a segment after the last one, merging them when both are contiguous
+        if length <= 0:
+            return
+        if self.lengths:
+            last_length = self.lengths[-1]
+            if self.input_offsets[-1] + last_length == input_offset \
+                    and self.output_offsets[-1] + last_length == output_offset:
+                self.lengths[-1] = last_length + length
+                return
+        self.input_offsets.append(input_offset)
+        self.output_offsets.append(output_offset)
+        self.lengths.append(length)
+
+    def to_input(self, output_offset: int):
+        # Returns the input offset of the character at output_offset. Text inserted by a repair
+        # maps to the input offset where it was inserted
+        return _lookup(self.output_offsets, self.input_offsets, self.lengths, output_offset)
+
+    def to_output(self, input_offset: int):
+        # Returns the output offset of the character at input_offset. Input removed by a repair
+        # maps to the output offset where it was removed
+        return _lookup(self.input_offsets, self.output_offsets, self.lengths, input_offset)
+
+
+def _lookup(offsets: array, targets: array, lengths: array, offset: int):
+    index = bisect_right(offsets, offset) - 1
+    if index < 0:
+        return 0
+    delta = offset - offsets[index]
+    return targets[index] + min(delta, lengths[index])
+
+
+class OffsetTrackingList(list):
+    # A list of output chunks which keeps the origin of every chunk in `origins`: None for text
+    # inserted by a repair, the input offset of its first character for a chunk taken one to one
+    # from the input, or a tuple (skip, input_offset, length) for a chunk of which only `length`
+    # characters after the first `skip` ones are taken from the input
+    def __init__(self):
+        super().__init__()
+        self.origins = []
+
+    def append(self, chunk):
+        super().append(chunk)
+        self.origins.append(None)
+
+    def insert(self, index, chunk):
+        super().insert(index, chunk)
+        self.origins.insert(index, None)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self.origins[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = list(value)
+            self.origins[key] = [None] * len(value)
+        else:
+            self.origins[key] = None
+        super().__setitem__(key, value)
+
+    def fill_offset_map(self, offset_map: OffsetMap):
+        offset_map.clear()
+        output_offset = 0
+        for chunk, origin in zip(self, self.origins):
+            if origin is not None:
+                if isinstance(origin, tuple):
+                    skip, input_offset, length = origin
+                    offset_map.add(input_offset, output_offset + skip, length)
+                else:
+                    offset_map.add(origin, output_offset, len(chunk))
+            output_offset += len(chunk)
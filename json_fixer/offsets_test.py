@@ -0,0 +1,86 @@
+import unittest
+
+from json_fixer.fixer import fix_json
+from json_fixer.offsets import OffsetMap
+
+
+def repair(text, **kwargs):
+    offset_map = OffsetMap()
+    output = fix_json(text, offset_map=offset_map, **kwargs)
+    return output, offset_map
+
+
+class TestOffsetMap(unittest.TestCase):
+    def test_should_merge_contiguous_segments(self):
+        offset_map = OffsetMap()
+        offset_map.add(0, 0, 2)
+        offset_map.add(2, 2, 3)
+        offset_map.add(6, 5, 1)
+        offset_map.add(7, 7, 0)
+        self.assertEqual(list(offset_map), [(0, 0, 5), (6, 5, 1)])
+
+    def test_should_map_both_directions(self):
+        offset_map = OffsetMap()
+        offset_map.add(2, 0, 3)
+        offset_map.add(8, 5, 2)
+        self.assertEqual([offset_map.to_input(offset) for offset in range(8)], [2, 3, 4, 5, 5, 8, 9, 10])
+        self.assertEqual([offset_map.to_output(offset) for offset in range(11)], [0, 0, 0, 1, 2, 3, 3, 3, 5, 6, 7])
+
+    def test_should_map_an_empty_map_to_zero(self):
+        self.assertEqual(OffsetMap().to_input(10), 0)
+        self.assertEqual(OffsetMap().to_output(10), 0)
+
+
+class TestFixJSONOffsetMap(unittest.TestCase):
+    def test_should_map_valid_json_one_to_one(self):
+        text = '{"a": [1, 2.5, "str"], "b": null}'
+        output, offset_map = repair(text)
+        self.assertEqual(output, text)
+        self.assertEqual(list(offset_map), [(0, 0, len(text))])
+
+    def test_should_map_around_repairs(self):
+        text = "{a: 'b' /* c */, d: [1 2]"
+        output, offset_map = repair(text)
+        self.assertEqual(output, '{"a": "b" , "d": [1, 2]}')
+        self.assertEqual(list(offset_map), [(0, 0, 1), (1, 2, 1), (2, 4, 6), (15, 10, 2), (17, 13, 1), (18, 15, 4),
+                                            (22, 20, 3)])
+
+        # the value of d
+        self.assertEqual(text[offset_map.to_input(output.index('[1, 2]')):], '[1 2]')
+        # the inserted comma maps to the spot of the missing comma
+        self.assertEqual(offset_map.to_input(output.index(', 2')), text.index(' 2'))
+        # the comment maps to the spot where it was removed
+        self.assertEqual(offset_map.to_output(text.index('/*')), output.index(', "d"'))
+
+    def test_should_map_replaced_characters(self):
+        text = "[True, None, 'x', “y”, undefined, 1."
+        output, offset_map = repair(text)
+        self.assertEqual(output, '[true, null, "x", "y", null, 1.0]')
+        for repaired, original in [('true', 'True'), ('null', 'None'), ('"x"', "'x'"), ('"y"', '“y”'), ('1.', '1.'),
+                                   ('null, 1', 'undefined')]:
+            start = output.index(repaired)
+            self.assertEqual(offset_map.to_input(start), text.index(original))
+            self.assertEqual(offset_map.to_output(text.index(original)), start)
+
+    def test_should_map_a_value_of_the_output_back_to_the_input(self):
+        text = '// comment\n{name: "John", age: "thirty"}'
+        output, offset_map = repair(text)
+        self.assertEqual(output, '\n{"name": "John", "age": "thirty"}')
+        self.assertEqual(text[offset_map.to_input(output.index('"thirty"')):], '"thirty"}')
+
+    def test_should_map_other_output_formats(self):
+        text = '{"a": [1, 2]}\n{"b": 3}'
+        for output_format in ['minified', {'indent': 2}]:
+            output, offset_map = repair(text, output_format=output_format)
+            for value in ['"a"', '2', '"b"', '3']:
+                self.assertEqual(offset_map.to_input(output.index(value)), text.index(value))
+
+    def test_should_map_recovered_output(self):
+        text = '[1, -x, "y"]'
+        (output, errors), offset_map = repair(text, recover=True)
+        self.assertEqual(output, '[1, "y"]')
+        self.assertEqual(offset_map.to_input(output.index('"y"')), text.index('"y"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
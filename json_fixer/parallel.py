@@ -0,0 +1,148 @@
+# Repair one huge top-level array on multiple cores.
+#
+# A cheap pre-scan finds the commas between the items of the array, outside of strings and
+# nested brackets. The items are grouped into slices which are repaired in a process pool
+# as small arrays of their own, and the results are joined again. Everything after the first
+# spot where the pre-scan cannot be sure about the structure (comments, escaped or special
+# quotes, unterminated strings) is repaired as one tail slice, and any input that does not
+# fit the pattern, or a slice that does not repair cleanly, falls back to a serial fix_json.
+from .fixer import JSONFixError, fix_json
+from .scanner import skip_string
+from .utils import compiled_pattern, is_whitespace
+
+DEFAULT_MIN_SIZE = 1_000_000  # characters
+
+# brackets, commas and quotes, plus the characters that make the pre-scan ambiguous:
+# comments, escape characters and special quotes
+structural_characters = '[{}\\[\\],"\'/\\\\“”‘’`´]'
+
+
+def scan_array_items(text: str, start: int):
+    # text[start] is the opening bracket of the top-level array. Returns a tuple
+    # (commas, end, ambiguous): the positions of the commas in between the items, the position
+    # of the closing bracket (None when not found), and whether the scan stopped early because
+    # the structure after the last comma is ambiguous
+    pattern = compiled_pattern(structural_characters)
+    commas = []
+    closing = [']']  # expected closing brackets of the open levels
+    index = start + 1
+    while True:
+        match = pattern.search(text, index)
+        if match is None:
+            return commas, None, False
+        index = match.start()
+        char = text[index]
+        if char == '"' or char == "'":
+            end = skip_string(text, index)
+            if end >= len(text) or text[end - 1] != char:
+                # unterminated string
+                return commas, None, True
+            if char == "'" and any(quote in text[index:end] for quote in '‘’`´'):
+                # fix_json ends a single quoted string at any single quote like character
+                return commas, None, True
+            index = end
+            continue
+        if char == '{':
+            closing.append('}')
+        elif char == '[':
+            closing.append(']')
+        elif char == '}' or char == ']':
+            if char != closing.pop():
+                # mismatched brackets, fix_json may close the levels at a different spot
+                return commas, None, True
+            if not closing:
+                return commas, index, False
+        elif char == ',':
+            if len(closing) == 1:
+                if not text[commas[-1] + 1 if commas else start + 1:index].strip():
+                    # an empty item ends the array in fix_json
+                    return commas, None, True
+                commas.append(index)
+        else:
+            return commas, None, True
+        index += 1
+
+
+def split_array(text: str, slice_size: int):
+    # Returns a tuple (start, slices, tail_start) with the position of the opening bracket, the
+    # (start, end) ranges of the slices that can be repaired independently, and the start of the
+    # tail slice which runs up to the end of the text. Returns None when the text is not a
+    # single top-level array that can be split
+    start = 0
+    while start < len(text) and is_whitespace(ord(text[start])):
+        start += 1
+    if start >= len(text) or text[start] != '[':
+        return None
+
+    commas, end, _ = scan_array_items(text, start)
+    if end is not None and not all(is_whitespace(ord(char)) for char in text[end + 1:]):
+        # more root level values after the array, like newline delimited JSON
+        return None
+
+    slices = []
+    slice_start = start + 1
+    for comma in commas:
+        if comma - slice_start >= slice_size:
+            slices.append((slice_start, comma))
+            slice_start = comma + 1
+    return start, slices, slice_start
+
+
+def fix_json_parallel(text: str, executor=None, workers: int = None, min_size: int = DEFAULT_MIN_SIZE,
+                      slice_size: int = None):
+    # Repairs text like fix_json(text). A top-level array of at least min_size characters is
+    # repaired in slices of about slice_size characters, using the given concurrent.futures
+    # executor or a new process pool with the given number of workers
+    if len(text) < min_size:
+        return fix_json(text)
+
+    if slice_size is None:
+        slice_size = max(len(text) // (4 * (workers or _cpu_count())), 1)
+    split = split_array(text, slice_size)
+    if split is None or not split[1]:
+        return fix_json(text)
+    start, slices, tail_start = split
+
+    texts = ['[' + text[slice_start:slice_end] + ']' for slice_start, slice_end in slices]
+    # the tail follows an item, so that fix_json sees it in the same context as in the whole text
+    texts.append('[0,' + text[tail_start:])
+
+    try:
+        if executor is not None:
+            outputs = list(executor.map(fix_json, texts))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(workers) as pool:
+                outputs = list(pool.map(fix_json, texts))
+    except JSONFixError:
+        # let the serial repair report the error with its position in the whole text
+        return fix_json(text)
+
+    items = []
+    for output in outputs[:-1]:
+        # every slice must come back as exactly one array holding items
+        if output[0] != '[' or output[-1] != ']' or not output[1:-1].strip():
+            return fix_json(text)
+        items.append(output[1:-1])
+
+    body = ','.join(items)
+    tail = outputs[-1]
+    if tail.startswith('[0,'):
+        return text[:start] + '[' + body + ',' + tail[3:]
+    if tail.startswith('[0') and tail[2:].strip() == ']':
+        # the array ends with a trailing comma, which is removed
+        tail_text = text[tail_start:].strip()
+        if tail_text == ']':
+            return text[:start] + '[' + body + tail[2:]
+        if tail_text == '':
+            # truncated: the closing bracket is inserted before the trailing whitespace
+            stripped = body.rstrip()
+            return text[:start] + '[' + stripped + ']' + body[len(stripped):] + tail[3:]
+    # the tail did not come back as the rest of one array, for example because an empty item
+    # split it up into multiple root level values
+    return fix_json(text)
+
+
+def _cpu_count():
+    import os
+    return os.cpu_count() or 1
@@ -0,0 +1,86 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from json_fixer.fixer import JSONFixError, fix_json
+from json_fixer.parallel import fix_json_parallel, split_array
+
+ITEMS = [
+    '{"id": 1, "tags": ["a", "b"]}',
+    "{id: 2, name: 'x, y'}",
+    '[1 2 3]',
+    '"str, with [brackets]"',
+    '{"nested": {"a": [1, {"b": 2,}]}}',
+    'True',
+    'NumberLong("3")',
+    '{"a": 1',
+]
+
+
+def parallel(text, **kwargs):
+    with ThreadPoolExecutor(4) as executor:
+        return fix_json_parallel(text, executor=executor, min_size=0, slice_size=20, **kwargs)
+
+
+class TestSplitArray(unittest.TestCase):
+    def test_should_split_at_top_level_commas(self):
+        text = ' [1, {"a": [2, 3]}, "4,5", 6]'
+        self.assertEqual(split_array(text, 1), (1, [(2, 3), (4, 18), (19, 25)], 26))
+
+    def test_should_not_split_other_root_values(self):
+        self.assertIsNone(split_array('{"a": [1, 2]}', 1))
+        self.assertIsNone(split_array('[1, 2]\n[3, 4]', 1))
+        self.assertIsNone(split_array('callback([1, 2])', 1))
+
+    def test_should_stop_at_ambiguous_structure(self):
+        # a comment may hide a comma, the rest is repaired as one tail slice
+        self.assertEqual(split_array('[1, 2, /* , */ 3, 4]', 1), (0, [(1, 2), (3, 5)], 6))
+        self.assertEqual(split_array('[1, "unterminated, 2, 3', 1), (0, [(1, 2)], 3))
+        self.assertEqual(split_array('[1, {"a": 2], 3, 4]', 1), (0, [(1, 2)], 3))
+
+
+class TestFixJSONParallel(unittest.TestCase):
+    def assert_same_as_serial(self, text):
+        self.assertEqual(parallel(text), fix_json(text), text)
+
+    def test_should_repair_like_fix_json(self):
+        for count in range(1, len(ITEMS) + 1):
+            items = ITEMS[:count]
+            self.assert_same_as_serial('[' + ', '.join(items[:-1] + ['0']) + ']')
+            self.assert_same_as_serial('\n[\n  ' + ',\n  '.join(items[:-1] + ['0']) + '\n]\n')
+
+    def test_should_repair_a_truncated_array(self):
+        for count in range(1, len(ITEMS) + 1):
+            self.assert_same_as_serial('[' + ', '.join(ITEMS[:count]))
+            self.assert_same_as_serial('[' + ', '.join(ITEMS[:count]) + ',')
+
+    def test_should_remove_a_trailing_comma(self):
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ', ]')
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ',\n]\n')
+
+    def test_should_repair_ambiguous_tails(self):
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ', /* a, b */ 1, // c, d\n 2]')
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ', “special, quotes”, 3]')
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ', \'it’s\', 3]')
+
+    def test_should_fall_back_to_serial_repair(self):
+        self.assert_same_as_serial('[' + ', '.join(ITEMS[:-1]) + ']\n[1, 2]')
+        self.assert_same_as_serial('{"a": [' + ', '.join(ITEMS[:-1]) + ']}')
+
+    def test_should_report_errors_of_the_whole_text(self):
+        text = '[' + ', '.join(ITEMS[:-1]) + ', {"a" @}, 1]'
+        with self.assertRaises(JSONFixError) as cm:
+            parallel(text)
+        self.assertEqual(cm.exception.position, text.index('@'))
+
+        with self.assertRaises(JSONFixError):
+            parallel('[' + ', '.join(ITEMS[:-1]) + ',, 1]')
+
+    def test_should_use_a_process_pool(self):
+        text = '[' + ', '.join(ITEMS[:-1] * 50) + ']'
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(fix_json_parallel(text, executor=executor, min_size=0, slice_size=100), fix_json(text))
+        self.assertEqual(fix_json_parallel(text, workers=2, min_size=0), fix_json(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
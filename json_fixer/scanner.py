@@ -0,0 +1,125 @@
+# Fast, output-free scanning of (possibly broken) JSON text: find where a value ends
+# without repairing it. Strings and the structural characters in between are located with
+# str.find and regular expressions, so no Python code runs per character.
+from types import MappingProxyType
+
+from .utils import compiled_pattern, is_special_whitespace, is_whitespace
+
+opening_brackets = '{[('
+closing_brackets = '}])'
+string_quotes = '"“”\'‘’`´'
+
+structural_characters = r'[{}\[\]()"“”\'‘’`´,\n/]'
+
+# The quotes which end a string, by its start quote, like in fix_json: a string in double
+# quotes ends at a double quote, a string in special double quotes at any double quote like
+# character, and a string in single quotes at any single quote like character
+_double_quote_like = '"“”'
+_single_quote_like = '\'‘’`´'
+end_quotes = MappingProxyType({
+    '"': '"',
+    **dict.fromkeys('“”', _double_quote_like),
+    **dict.fromkeys(_single_quote_like, _single_quote_like),
+})
+
+
+def skip_string(text: str, start: int):
+    # text[start] is a quote. Returns the index after the matching end quote,
+    # or the length of the text when the string is not terminated
+    quote = text[start]
+    quotes = end_quotes[quote]
+    if len(quotes) > 1:
+        return _skip_string_until(text, start, quotes)
+    index = start + 1
+    while True:
+        end = text.find(quote, index)
+        if end == -1:
+            return len(text)
+
+        # the quote is escaped when preceded by an odd number of backslashes
+        backslash = end - 1
+        while backslash > start and text[backslash] == '\\':
+            backslash -= 1
+        if (end - backslash) % 2 == 1:
+            return end + 1
+        index = end + 1
+
+
+def _skip_string_until(text: str, start: int, quotes: str):
+    # skips a string which ends at any of the quotes, and where a backslash escapes the next
+    # character
+    pattern = compiled_pattern('[\\\\' + quotes + ']')
+    index = start + 1
+    while True:
+        match = pattern.search(text, index)
+        if match is None:
+            return len(text)
+        index = match.start()
+        if text[index] != '\\':
+            return index + 1
+        index += 2
+
+
+def skip_value(text: str, start: int):
+    # Returns the index after the value starting at text[start]. An object or array ends at
+    # its matching closing bracket. Any other value, like a number, unquoted string or JSONP
+    # call, ends at the next comma or newline on its own level. Brackets inside strings and
+    # comments are ignored, and a value that is not closed ends at the end of the text
+    pattern = compiled_pattern(structural_characters)
+    container = text[start] in '{['
+    depth = 0
+    index = start
+    while True:
+        match = pattern.search(text, index)
+        if match is None:
+            return len(text)
+        index = match.start()
+        char = text[index]
+        if char in string_quotes:
+            index = skip_string(text, index)
+            continue
+        if char == '/':
+            next_char = text[index + 1:index + 2]
+            if next_char == '*':
+                end = text.find('*/', index + 2)
+                index = len(text) if end == -1 else end + 2
+            elif next_char == '/':
+                # continue at the newline, which ends a value other than an object or array
+                end = text.find('\n', index + 2)
+                index = len(text) if end == -1 else end
+            else:
+                index += 1
+            continue
+        if char in opening_brackets:
+            depth += 1
+        elif char in closing_brackets:
+            if depth == 0:
+                # closing bracket of an enclosing level
+                return index
+            depth -= 1
+            if depth == 0 and container:
+                return index + 1
+        elif depth == 0:
+            # comma or newline
+            return index
+        index += 1
+
+
+def skip_separators(text: str, start: int, commas: bool = True):
+    # skip whitespace, commas and comments in between root level values, or only whitespace
+    # and comments when commas is False. Special whitespace counts as whitespace, like fix_json
+    # repairs it
+    index = start
+    while index < len(text):
+        char = text[index]
+        if char == ',' and commas or is_whitespace(ord(char)) or is_special_whitespace(ord(char)):
+            index += 1
+        elif text.startswith('/*', index):
+            end = text.find('*/', index + 2)
+            index = len(text) if end == -1 else end + 2
+        elif text.startswith('//', index):
+            end = text.find('\n', index + 2)
+            index = len(text) if end == -1 else end + 1
+        else:
+            break
+    return index
@@ -0,0 +1,103 @@
+# Split concatenated or newline delimited JSON into its root level values, and repair
+# every value on its own instead of merging them into one big array like fix_json does.
+#
+# For large files, build_offset_index stores the byte offsets of every root value in an
+# index file, so read_root_value can later seek to value N and repair only that slice.
+import sys
+from array import array
+
+from .fixer import JSONFixError, fix_json
+from .scanner import skip_value, skip_separators
+from .utils import is_whitespace
+
+INDEX_MAGIC = b'JFIXIDX1'
+
+
+def iter_root_spans(text: str):
+    # yields a tuple (start, end) for every root level value in the text, without repairing it
+    index = skip_separators(text, 0)
+    while index < len(text):
+        start = index
+        end = skip_value(text, start)
+        if end == start:
+            # a stray closing bracket
+            raise JSONFixError('Unexpected character ' + repr(text[start]), start, 'unexpected_character')
+
+        index = skip_separators(text, end)
+        while end > start and is_whitespace(ord(text[end - 1])):
+            end -= 1
+        yield start, end
+
+
+def iter_root_values(text: str):
+    # yields a tuple (start, end, repaired) for every root level value in the text
+    for start, end in iter_root_spans(text):
+        try:
+            repaired = fix_json(text[start:end])
+        except JSONFixError as err:
+            # report the position in the whole text instead of in the slice
+            raise JSONFixError(err.message, err.position + start, err.code,
+                               (err.span[0] + start, err.span[1] + start)) from None
+        yield start, end, repaired
+
+
+def default_index_path(path: str):
+    return path + '.idx'
+
+
+def build_offset_index(path: str, index_path: str = None, encoding: str = 'utf-8'):
+    # Scans the file once, without repairing, and writes the byte offsets (start, end) of
+    # every root level value to the index file. Returns the number of values
+    with open(path, 'r', encoding=encoding, newline='') as file:
+        text = file.read()
+
+    offsets = array('Q')
+    position = 0  # character offset in text
+    byte_position = 0  # byte offset in the file
+    for start, end in iter_root_spans(text):
+        byte_position += len(text[position:start].encode(encoding))
+        offsets.append(byte_position)
+        byte_position += len(text[start:end].encode(encoding))
+        offsets.append(byte_position)
+        position = end
+
+    write_offset_index(index_path or default_index_path(path), offsets)
+    return len(offsets) // 2
+
+
+def write_offset_index(index_path: str, offsets: array):
+    if sys.byteorder != 'little':
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    with open(index_path, 'wb') as file:
+        file.write(INDEX_MAGIC)
+        offsets.tofile(file)
+
+
+def load_offset_index(index_path: str):
+    # returns a flat array('Q') with the byte offsets start0, end0, start1, end1, ...
+    with open(index_path, 'rb') as file:
+        if file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            raise ValueError(f'{index_path} is not a json_fixer offset index')
+        offsets = array('Q')
+        offsets.frombytes(file.read())
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    return offsets
+
+
+def read_root_value(path: str, number: int, index_path: str = None, encoding: str = 'utf-8', offsets=None):
+    # Repairs and returns root level value number `number` (starting at 0) of the file,
+    # reading only its slice. Pass `offsets` from load_offset_index to avoid reloading it
+    if offsets is None:
+        offsets = load_offset_index(index_path or default_index_path(path))
+    if not 0 <= number < len(offsets) // 2:
+        raise IndexError(f'root value {number} out of range')
+
+    start = offsets[2 * number]
+    end = offsets[2 * number + 1]
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return fix_json(data.decode(encoding))
+
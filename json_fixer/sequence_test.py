@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from json_fixer.fixer import JSONFixError, fix_json
+from json_fixer.sequence import build_offset_index, iter_root_values, load_offset_index, read_root_value
+
+TEXT = ('{"a":1}\n'
+        '{b: [1,2,"x]"]}, [3 4]\n'
+        '/* comment */ "str"\n'
+        '  callback({"c": 1});\n'
+        '\n'
+        '{"trunc": [1,')
+
+
+class TestIterRootValues(unittest.TestCase):
+    def test_should_split_root_values(self):
+        values = list(iter_root_values(TEXT))
+        self.assertEqual([repaired for _, _, repaired in values], [
+            '{"a":1}', '{"b": [1,2,"x]"]}', '[3, 4]', '"str"', '{"c": 1}', '{"trunc": [1]}'
+        ])
+        self.assertEqual([TEXT[start:end] for start, end, _ in values], [
+            '{"a":1}', '{b: [1,2,"x]"]}', '[3 4]', '"str"', 'callback({"c": 1});', '{"trunc": [1,'
+        ])
+
+    def test_should_handle_escaped_quotes_and_a_single_value(self):
+        self.assertEqual(list(iter_root_values(' {"a": "\\"}"} ')), [(1, 13, '{"a": "\\"}"}')])
+        self.assertEqual(list(iter_root_values('  ')), [])
+
+    def test_should_report_positions_in_the_whole_text(self):
+        with self.assertRaises(JSONFixError) as cm:
+            list(iter_root_values('[1]\n{"a" @}'))
+        self.assertEqual(cm.exception.position, 9)
+
+        with self.assertRaises(JSONFixError) as cm:
+            list(iter_root_values('[1]\n]'))
+        self.assertEqual(cm.exception.position, 4)
+
+    def test_should_split_strings_in_special_quotes(self):
+        for text in ['“a, b”\n“c”', "{'a': ‘x]’, b: `[1´}\n[2]", "[‘a’, {“k”: ‘v]’}]\n[3]"]:
+            values = list(iter_root_values(text))
+            self.assertEqual(len(values), 2, text)
+            self.assertEqual(fix_json(text), '[\n' + ',\n'.join(repaired for _, _, repaired in values) + '\n]', text)
+
+
+class TestOffsetIndex(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'values.json')
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            file.write('{"name": "йнформация"}\r\n{name: \'😀\'}\r\n[1 2')
+
+    def test_should_read_values_by_number(self):
+        self.assertEqual(build_offset_index(self.path), 3)
+        self.assertEqual(read_root_value(self.path, 1), '{"name": "😀"}')
+        self.assertEqual(read_root_value(self.path, 2), '[1, 2]')
+        self.assertEqual(read_root_value(self.path, 0), '{"name": "йнформация"}')
+
+        with self.assertRaises(IndexError):
+            read_root_value(self.path, 3)
+
+    def test_should_store_byte_offsets(self):
+        index_path = self.path + '.custom'
+        build_offset_index(self.path, index_path)
+        offsets = load_offset_index(index_path)
+        self.assertEqual(list(offsets), [0, 32, 34, 48, 50, 54])
+        self.assertEqual(read_root_value(self.path, 1, offsets=offsets), '{"name": "😀"}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+# HTTP service exposing fix_json, meant to run as a sidecar container:
+#
+#   POST /fix          body: broken JSON text, response: repaired JSON text
+#   POST /fix/batch    body: JSON array of strings, response: JSON array of results
+#   GET  /metrics      Prometheus text format: latency histograms and repair counts
+#
+# Repairs are executed in a pre-forked pool of worker processes, so a slow document
+# never blocks the request threads. Start it with `python -m json_fixer.server`.
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .fixer import JSONFixError, fix_json
+
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024  # 10 MiB
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def fix_document(text: str):
+    # Runs inside a worker process. Returns ('ok', output), ('error', JSONFixError) when the
+    # document cannot be repaired, or ('failed', message) when the repair itself failed
+    try:
+        return 'ok', fix_json(text)
+    except JSONFixError as err:
+        return 'error', err.with_traceback(None)
+    except Exception as err:
+        # not every exception can be pickled, so only its type is passed back
+        return 'failed', f'Internal error: {type(err).__name__}'
+
+
+def result_json(result):
+    # the JSON of the result of fix_document, for a response or an item of a batch response
+    if result[0] == 'error':
+        return {'error': str(result[1]), 'position': result[1].position}
+    return {'error': result[1]}
+
+
+def fix_documents(texts):
+    return [fix_document(text) for text in texts]
+
+
+def _noop():
+    return os.getpid()
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (endpoint, status) -> count
+        self.documents = {'repaired': 0, 'unchanged': 0, 'failed': 0}
+        self.latency_buckets = {}  # endpoint -> list of bucket counts
+        self.latency_sum = {}  # endpoint -> total seconds
+        self.latency_count = {}  # endpoint -> number of observations
+
+    def observe_request(self, endpoint: str, status: int, seconds: float):
+        with self._lock:
+            key = (endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            buckets = self.latency_buckets.get(endpoint)
+            if buckets is None:
+                buckets = self.latency_buckets[endpoint] = [0] * len(LATENCY_BUCKETS)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[index] += 1
+            self.latency_sum[endpoint] = self.latency_sum.get(endpoint, 0.0) + seconds
+            self.latency_count[endpoint] = self.latency_count.get(endpoint, 0) + 1
+
+    def observe_documents(self, texts, results):
+        with self._lock:
+            for text, result in zip(texts, results):
+                if result[0] != 'ok':
+                    self.documents['failed'] += 1
+                elif result[1] != text:
+                    self.documents['repaired'] += 1
+                else:
+                    self.documents['unchanged'] += 1
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP json_fixer_requests_total Number of HTTP requests handled.',
+                '# TYPE json_fixer_requests_total counter',
+            ]
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'json_fixer_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines += [
+                '# HELP json_fixer_documents_total Number of documents processed, by outcome.',
+                '# TYPE json_fixer_documents_total counter',
+            ]
+            for outcome, count in self.documents.items():
+                lines.append(f'json_fixer_documents_total{{outcome="{outcome}"}} {count}')
+
+            lines += [
+                '# HELP json_fixer_request_duration_seconds Request latency.',
+                '# TYPE json_fixer_request_duration_seconds histogram',
+            ]
+            for endpoint, buckets in sorted(self.latency_buckets.items()):
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(
+                        f'json_fixer_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                total = self.latency_count[endpoint]
+                lines.append(f'json_fixer_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {total}')
+                lines.append(
+                    f'json_fixer_request_duration_seconds_sum{{endpoint="{endpoint}"}} {self.latency_sum[endpoint]}')
+                lines.append(f'json_fixer_request_duration_seconds_count{{endpoint="{endpoint}"}} {total}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FixRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive as long as every response has a Content-Length
+    protocol_version = 'HTTP/1.1'
+    server_version = 'json-fixer'
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self.send_text(200, self.server.metrics.render(), 'text/plain; version=0.0.4')
+        else:
+            self.send_error_json(404, 'Not found')
+
+    def do_POST(self):
+        started = time.perf_counter()
+        endpoint = self.path
+        try:
+            if self.path == '/fix':
+                status, body = self.handle_fix()
+            elif self.path == '/fix/batch':
+                status, body = self.handle_batch()
+            else:
+                endpoint = 'other'
+                raise RequestError(404, 'Not found')
+            self.send_text(status, body, 'application/json')
+        except RequestError as err:
+            status = err.status
+            self.send_error_json(status, str(err))
+        except Exception:
+            status = 500
+            self.log_error('Unexpected error while handling %s', self.path)
+            self.close_connection = True
+            self.send_error_json(status, 'Internal error')
+        self.server.metrics.observe_request(endpoint, status, time.perf_counter() - started)
+
+    def handle_fix(self):
+        text = self.read_body()
+        result = self.server.run(fix_document, text)
+        self.server.metrics.observe_documents([text], [result])
+        if result[0] == 'ok':
+            return 200, result[1]
+        return 422 if result[0] == 'error' else 500, json.dumps(result_json(result))
+
+    def handle_batch(self):
+        try:
+            texts = json.loads(self.read_body())
+        except ValueError:
+            raise RequestError(400, 'Request body must be a JSON array of strings')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise RequestError(400, 'Request body must be a JSON array of strings')
+        if len(texts) > self.server.max_batch_size:
+            raise RequestError(413, f'Batch exceeds the maximum of {self.server.max_batch_size} documents')
+
+        results = self.server.run_batch(texts)
+        self.server.metrics.observe_documents(texts, results)
+        return 200, json.dumps([
+            {'output': result[1]} if result[0] == 'ok' else result_json(result)
+            for result in results
+        ])
+
+    def read_body(self):
+        length = self.headers.get('Content-Length')
+        if length is None:
+            raise RequestError(411, 'Content-Length required')
+        try:
+            length = int(length)
+        except ValueError:
+            raise RequestError(400, 'Invalid Content-Length')
+        if length < 0:
+            raise RequestError(400, 'Invalid Content-Length')
+        if length > self.server.max_body_size:
+            # the body is not read, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError(413, f'Request body exceeds the maximum of {self.server.max_body_size} bytes')
+        try:
+            return self.rfile.read(length).decode('utf-8')
+        except UnicodeDecodeError:
+            raise RequestError(400, 'Request body must be UTF-8 encoded')
+
+    def send_error_json(self, status: int, message: str):
+        self.send_text(status, json.dumps({'error': message}), 'application/json')
+
+    def send_text(self, status: int, body: str, content_type: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type + ('' if 'charset' in content_type else '; charset=utf-8'))
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class FixServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers: int = None, max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, quiet: bool = False):
+        super().__init__(address, FixRequestHandler)
+        self.max_body_size = max_body_size
+        self.max_batch_size = max_batch_size
+        self.quiet = quiet
+        self.metrics = Metrics()
+
+        # workers=0 repairs inside the request threads, which is handy for tests
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.executor = None
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            # pre-fork: spawn all worker processes now instead of on the first requests
+            futures = [self.executor.submit(_noop) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+
+    def run(self, function, argument):
+        if self.executor is None:
+            return function(argument)
+        return self.executor.submit(function, argument).result()
+
+    def run_batch(self, texts):
+        if self.executor is None or len(texts) <= 1:
+            return [self.run(fix_document, text) for text in texts]
+
+        # send each worker a single slice of the batch to limit the number of round trips
+        size = -(-len(texts) // self.workers)
+        futures = [self.executor.submit(fix_documents, texts[start:start + size])
+                   for start in range(0, len(texts), size)]
+        return [result for future in futures for result in future.result()]
+
+    def server_close(self):
+        super().server_close()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve fix_json over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on (default: 8000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes, 0 to repair in-process (default: CPU count)')
+    parser.add_argument('--max-body-size', type=int, default=DEFAULT_MAX_BODY_SIZE,
+                        help=f'maximum request body size in bytes (default: {DEFAULT_MAX_BODY_SIZE})')
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f'maximum number of documents per batch (default: {DEFAULT_MAX_BATCH_SIZE})')
+    parser.add_argument('--quiet', action='store_true', help='do not log requests')
+    args = parser.parse_args(argv)
+
+    server = FixServer((args.host, args.port), workers=args.workers, max_body_size=args.max_body_size,
+                       max_batch_size=args.max_batch_size, quiet=args.quiet)
+    print(f'Serving fix_json on http://{args.host}:{server.server_address[1]} with {server.workers} workers')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
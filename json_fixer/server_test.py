@@ -0,0 +1,115 @@
+import http.client
+import json
+import threading
+import unittest
+from unittest import mock
+
+from json_fixer import server
+from json_fixer.server import FixServer
+
+
+def fix_json_failing_on_x(text):
+    # a stand-in for a bug in the parser
+    if 'x' in text:
+        raise IndexError('string index out of range')
+    return text
+
+
+class TestFixServer(unittest.TestCase):
+    workers = 0
+
+    def setUp(self):
+        self.server = FixServer(('127.0.0.1', 0), workers=self.workers, max_body_size=1024, max_batch_size=3,
+                                quiet=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=10)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, method: str, path: str, body: str = None):
+        self.connection.request(method, path, body=body)
+        response = self.connection.getresponse()
+        return response.status, response.read().decode('utf-8')
+
+    def test_fix(self):
+        self.assertEqual(self.request('POST', '/fix', "{name: 'John',}"), (200, '{"name": "John"}'))
+
+    def test_fix_unfixable_document(self):
+        status, body = self.request('POST', '/fix', 'foo [')
+        self.assertEqual(status, 422)
+        self.assertEqual(json.loads(body), {'error': "Unexpected character '[' at position 4", 'position': 4})
+
+    def test_fix_batch(self):
+        status, body = self.request('POST', '/fix/batch', json.dumps(['[1,2', '{a:1}', 'foo [']))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), [
+            {'output': '[1,2]'},
+            {'output': '{"a":1}'},
+            {'error': "Unexpected character '[' at position 4", 'position': 4},
+        ])
+
+    def test_fix_batch_requires_an_array_of_strings(self):
+        self.assertEqual(self.request('POST', '/fix/batch', '{"a": 1}')[0], 400)
+        self.assertEqual(self.request('POST', '/fix/batch', '[1, 2]')[0], 400)
+        self.assertEqual(self.request('POST', '/fix/batch', 'not json')[0], 400)
+
+    def test_limits(self):
+        self.assertEqual(self.request('POST', '/fix/batch', json.dumps(['1', '2', '3', '4']))[0], 413)
+        self.assertEqual(self.request('POST', '/fix', 'x' * 2048)[0], 413)
+
+    def test_keep_alive(self):
+        self.request('POST', '/fix', '[1')
+        socket = self.connection.sock
+        self.assertIsNotNone(socket)
+        self.assertEqual(self.request('POST', '/fix', '[2'), (200, '[2]'))
+        self.assertIs(self.connection.sock, socket)
+
+    def test_unknown_path(self):
+        self.assertEqual(self.request('GET', '/unknown')[0], 404)
+        self.assertEqual(self.request('POST', '/unknown', '1')[0], 404)
+
+    def test_internal_errors(self):
+        if self.workers:
+            self.skipTest('the stand-in parser is patched in this process only')
+        with mock.patch.object(server, 'fix_json', fix_json_failing_on_x):
+            self.assertEqual(self.request('POST', '/fix', '["x"]'), (500, '{"error": "Internal error: IndexError"}'))
+            status, body = self.request('POST', '/fix/batch', json.dumps(['[1]', '["x"]']))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), [{'output': '[1]'}, {'error': 'Internal error: IndexError'}])
+
+        body = self.request('GET', '/metrics')[1]
+        self.assertIn('json_fixer_requests_total{endpoint="/fix",status="500"} 1', body)
+        self.assertIn('json_fixer_documents_total{outcome="failed"} 2', body)
+
+    def test_unexpected_errors(self):
+        with mock.patch.object(self.server, 'run', side_effect=RuntimeError('broken pool')):
+            self.assertEqual(self.request('POST', '/fix', '[1]'), (500, '{"error": "Internal error"}'))
+        self.assertEqual(self.request('POST', '/fix', '[1'), (200, '[1]'))
+        self.assertIn('json_fixer_requests_total{endpoint="/fix",status="500"} 1', self.request('GET', '/metrics')[1])
+
+    def test_metrics(self):
+        self.request('POST', '/fix', '[1')
+        self.request('POST', '/fix', '[1]')
+        self.request('POST', '/fix', 'foo [')
+
+        status, body = self.request('GET', '/metrics')
+        self.assertEqual(status, 200)
+        self.assertIn('json_fixer_requests_total{endpoint="/fix",status="200"} 2', body)
+        self.assertIn('json_fixer_requests_total{endpoint="/fix",status="422"} 1', body)
+        self.assertIn('json_fixer_documents_total{outcome="repaired"} 1', body)
+        self.assertIn('json_fixer_documents_total{outcome="unchanged"} 1', body)
+        self.assertIn('json_fixer_documents_total{outcome="failed"} 1', body)
+        self.assertIn('json_fixer_request_duration_seconds_count{endpoint="/fix"} 3', body)
+
+
+class TestFixServerWithWorkerProcesses(TestFixServer):
+    workers = 2
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+# Process pool which passes large documents to the workers in shared memory.
+#
+# Sending a str to a worker process pickles it and copies it through a pipe, and so does the
+# result on the way back. SharedMemoryPool instead writes the UTF-8 encoded input into a
+# multiprocessing.shared_memory buffer, and the worker writes its output into a second one:
+# only the names of the buffers and the sizes go through the pipe. Buffers are returned to
+# the pool as soon as a call is done, whether or not its result is ever fetched, and reused by
+# the next ones, so a steady stream of documents does not create and map new segments all the
+# time.
+import os
+import threading
+from collections import deque
+
+from .fixer import fix_json
+
+DEFAULT_MIN_SIZE = 256 * 1024  # characters, smaller documents are pickled
+MIN_BUFFER_SIZE = 1024 * 1024  # bytes
+
+
+def buffer_capacity(size: int):
+    # round up to a power of two, so buffers fit a range of document sizes
+    return max(MIN_BUFFER_SIZE, 1 << (size - 1).bit_length())
+
+
+def _write(shm, data: bytes):
+    with shm.buf[:len(data)] as view:
+        view[:] = data
+
+
+def _read(shm, size: int):
+    with shm.buf[:size] as view:
+        return str(view, 'utf-8', 'surrogatepass')
+
+
+def _run_shared(function, input_name: str, input_size: int, output_name: str):
+    # Runs inside a worker process: reads the input from its buffer, and writes function(input)
+    # into the output buffer. When the output does not fit, it is written into a new buffer,
+    # which the pool takes over. Returns a tuple ('ok', size, name of the new buffer or None),
+    # or ('error', exception)
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(name=input_name)
+    try:
+        text = _read(shm, input_size)
+    finally:
+        shm.close()
+
+    try:
+        data = function(text).encode('utf-8', 'surrogatepass')
+    except Exception as err:
+        return 'error', err.with_traceback(None)
+    del text
+
+    shm = SharedMemory(name=output_name)
+    new_name = None
+    if len(data) > shm.size:
+        shm.close()
+        shm = SharedMemory(create=True, size=buffer_capacity(len(data)))
+        new_name = shm.name
+    try:
+        _write(shm, data)
+    finally:
+        shm.close()
+    return 'ok', len(data), new_name
+
+
+def _fix_function(output_format, profile):
+    if output_format == 'preserve' and profile is None:
+        return fix_json
+    from functools import partial
+    return partial(fix_json, output_format=output_format, profile=profile)
+
+
+def _noop():
+    return os.getpid()
+
+
+class SharedMemoryPool:
+    # A pool of worker processes for functions from str to str, like fix_json. Documents of
+    # at least min_size characters are passed in shared memory, smaller ones are pickled.
+    # Calls can be made from several threads at once, to keep all workers busy. Use it as a
+    # context manager, or call close() to stop the workers and free the buffers
+    def __init__(self, workers: int = None, min_size: int = DEFAULT_MIN_SIZE, max_idle_buffers: int = None):
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import resource_tracker
+
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.min_size = min_size
+        # enough for the input and output of every worker, and of one call in preparation
+        self.max_idle_buffers = 2 * self.workers + 2 if max_idle_buffers is None else max_idle_buffers
+        self._lock = threading.Lock()
+        self._idle = {}  # buffers that are not in use, a deque for every size
+        self._idle_count = 0
+        self._closed = False
+
+        # the workers must share the resource tracker of this process, so that the buffers
+        # they create are not unlinked when they exit
+        resource_tracker.ensure_running()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # pre-fork: spawn all worker processes now instead of on the first calls
+        futures = [self.executor.submit(_noop) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _acquire(self, size: int):
+        # returns an idle buffer of at least size bytes, the smallest one, or a new one
+        with self._lock:
+            if self._closed:
+                raise ValueError('SharedMemoryPool is closed')
+            # the sizes are powers of two, there are only a few of them
+            fitting = [capacity for capacity, buffers in self._idle.items() if capacity >= size and buffers]
+            if fitting:
+                self._idle_count -= 1
+                return self._idle[min(fitting)].popleft()
+        from multiprocessing.shared_memory import SharedMemory
+        return SharedMemory(create=True, size=buffer_capacity(size))
+
+    def _release(self, shm):
+        with self._lock:
+            if not self._closed and self._idle_count < self.max_idle_buffers:
+                buffers = self._idle.get(shm.size)
+                if buffers is None:
+                    buffers = self._idle[shm.size] = deque()
+                buffers.append(shm)
+                self._idle_count += 1
+                return
+        shm.close()
+        shm.unlink()
+
+    def idle_buffers(self):
+        # returns the sizes of the buffers kept for reuse, in increasing order
+        with self._lock:
+            return sorted(shm.size for buffers in self._idle.values() for shm in buffers)
+
+    def submit(self, function, text: str):
+        # Starts function(text) in a worker process. Returns a concurrent.futures.Future of
+        # the result, which raises the exception of the worker. The buffers of the call are
+        # released when it is done, without waiting for the result to be fetched
+        if len(text) < self.min_size:
+            return self.executor.submit(function, text)
+
+        data = text.encode('utf-8', 'surrogatepass')
+        input_shm = self._acquire(len(data))
+        output_shm = None
+        try:
+            _write(input_shm, data)
+            # most repairs add only a few characters
+            output_shm = self._acquire(len(data) + len(data) // 8)
+            worker_future = self.executor.submit(_run_shared, function, input_shm.name, len(data), output_shm.name)
+        except BaseException:
+            self._release(input_shm)
+            if output_shm is not None:
+                self._release(output_shm)
+            raise
+        del data
+
+        from concurrent.futures import Future
+        future = Future()
+        # like the futures of the executor once a worker picked them up, it cannot be cancelled
+        future.set_running_or_notify_cancel()
+
+        def done(worker_future):
+            # runs when the worker is done: reads the output and releases the buffers before
+            # the result is set, so they can be reused as soon as the caller has it
+            nonlocal output_shm
+            try:
+                try:
+                    outcome = worker_future.result()
+                    if outcome[0] == 'error':
+                        raise outcome[1]
+                    _, size, new_name = outcome
+                    if new_name is not None:
+                        # take over the larger buffer created by the worker
+                        from multiprocessing.shared_memory import SharedMemory
+                        self._release(output_shm)
+                        output_shm = SharedMemory(name=new_name)
+                    output = _read(output_shm, size)
+                finally:
+                    self._release(input_shm)
+                    self._release(output_shm)
+            except BaseException as err:
+                future.set_exception(err)
+            else:
+                future.set_result(output)
+
+        worker_future.add_done_callback(done)
+        return future
+
+    def run(self, function, text: str):
+        return self.submit(function, text).result()
+
+    def fix(self, text: str, output_format='preserve', profile=None):
+        # Repairs the text in a worker process like fix_json(text, output_format=output_format,
+        # profile=profile), and raises its JSONFixError when it cannot be repaired
+        return self.run(_fix_function(output_format, profile), text)
+
+    def fix_all(self, texts, output_format='preserve', profile=None):
+        # Repairs all texts in parallel, and returns a list with the outputs. Raises the first
+        # JSONFixError after all repairs are done
+        function = _fix_function(output_format, profile)
+        futures = [self.submit(function, text) for text in texts]
+        outputs = []
+        error = None
+        for future in futures:
+            try:
+                outputs.append(future.result())
+            except Exception as err:
+                error = error or err
+        if error is not None:
+            raise error
+        return outputs
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+            self._idle_count = 0
+        self.executor.shutdown()
+        for buffers in idle.values():
+            for shm in buffers:
+                shm.close()
+                shm.unlink()
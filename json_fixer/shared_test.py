@@ -0,0 +1,96 @@
+import unittest
+from concurrent.futures import Future, wait
+from multiprocessing.shared_memory import SharedMemory
+
+from json_fixer.fixer import JSONFixError, fix_json
+from json_fixer.shared import MIN_BUFFER_SIZE, SharedMemoryPool, buffer_capacity
+
+TEXT = "[{name: 'Zoë 😀', tags: [a, b,]}, /* note */ {id: 2} " * 20
+
+
+class TestBufferCapacity(unittest.TestCase):
+    def test_should_round_up_to_a_power_of_two(self):
+        self.assertEqual(buffer_capacity(0), MIN_BUFFER_SIZE)
+        self.assertEqual(buffer_capacity(MIN_BUFFER_SIZE), MIN_BUFFER_SIZE)
+        self.assertEqual(buffer_capacity(MIN_BUFFER_SIZE + 1), 2 * MIN_BUFFER_SIZE)
+        self.assertEqual(buffer_capacity(3 * MIN_BUFFER_SIZE), 4 * MIN_BUFFER_SIZE)
+
+
+class TestSharedMemoryPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = SharedMemoryPool(workers=1, min_size=100, max_idle_buffers=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_should_repair_like_fix_json(self):
+        self.assertEqual(self.pool.fix(TEXT), fix_json(TEXT))
+        self.assertEqual(self.pool.fix(TEXT, output_format='minified'), fix_json(TEXT, output_format='minified'))
+        profile = ['comments', 'ndjson', 'special_quotes', 'unquoted_strings']
+        self.assertEqual(self.pool.fix(TEXT, profile=profile), fix_json(TEXT, profile=profile))
+        # small documents are pickled
+        self.assertEqual(self.pool.fix("{a: 'b'}"), '{"a": "b"}')
+
+    def test_should_pass_lone_surrogates(self):
+        text = '["\ud800"' + ' ' * 100
+        self.assertEqual(self.pool.run(str, text), text)
+
+    def test_should_reuse_buffers(self):
+        self.pool.fix(TEXT)
+        idle = self.pool.idle_buffers()
+        for _ in range(5):
+            self.pool.fix(TEXT)
+        self.assertEqual(self.pool.idle_buffers(), idle)
+        self.assertLessEqual(len(idle), 4)
+
+    def test_should_grow_the_output_buffer(self):
+        # the quotes added around every item make the output larger than the buffer of the pool
+        text = '[' + ','.join(['ab'] * (MIN_BUFFER_SIZE // 4))
+        output = fix_json(text)
+        self.assertGreater(len(output), MIN_BUFFER_SIZE)
+        self.assertEqual(self.pool.fix(text), output)
+        self.assertIn(buffer_capacity(len(output)), self.pool.idle_buffers())
+
+    def test_should_raise_the_error_of_the_worker(self):
+        with self.assertRaises(JSONFixError) as cm:
+            self.pool.fix('{"a" @}' + ' ' * 100)
+        self.assertEqual(cm.exception.position, 5)
+
+    def test_should_return_a_future(self):
+        future = self.pool.submit(fix_json, TEXT)
+        self.assertIsInstance(future, Future)
+        self.assertEqual(future.result(), fix_json(TEXT))
+        self.assertFalse(future.cancel())
+        self.assertEqual(self.pool.submit(fix_json, '[1, 2').result(), '[1, 2]')
+        future = self.pool.submit(fix_json, '{"a" @}' + ' ' * 100)
+        self.assertIsInstance(future.exception(), JSONFixError)
+
+    def test_should_release_the_buffers_when_done(self):
+        with SharedMemoryPool(workers=1, min_size=0) as pool:
+            # the results are never fetched
+            for text in [TEXT, '{"a" @}', TEXT]:
+                wait([pool.submit(fix_json, text)])
+                self.assertEqual(len(pool.idle_buffers()), 2)
+
+    def test_should_repair_all_documents(self):
+        texts = [TEXT, '[1, 2', TEXT + ' ' * 1000]
+        self.assertEqual(self.pool.fix_all(texts), [fix_json(text) for text in texts])
+        with self.assertRaises(JSONFixError):
+            self.pool.fix_all([TEXT, '{"a" @}' + ' ' * 100, TEXT])
+
+    def test_should_free_the_buffers_on_close(self):
+        with SharedMemoryPool(workers=1, min_size=0) as pool:
+            pool.fix(TEXT)
+            names = [shm.name for buffers in pool._idle.values() for shm in buffers]
+            self.assertEqual(len(names), 2)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name=name)
+        with self.assertRaises(ValueError):
+            pool.fix(TEXT)
+
+
+if __name__ == '__main__':
+    unittest.main()
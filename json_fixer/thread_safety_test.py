@@ -0,0 +1,71 @@
+import importlib
+import pkgutil
+import types
+import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import json_fixer
+from json_fixer.fixer import JSONFixError, fix_json
+from json_fixer.literal import fix_python_literal
+from json_fixer.offsets import OffsetMap
+from json_fixer.sequence import iter_root_values
+from json_fixer.utils import compiled_pattern
+
+DOCUMENTS = [
+    '{"a": [1, 2.5, "str", true, null]}',
+    "{name: 'John', tags: [a, b,], active: True, /* comment */ parent: None}",
+    '[1 2 3',
+    '{"a": "unterminated',
+    '{\\"stringified\\": \\"content\\"}',
+    'callback([NumberLong("2"), "x" + "y"]);',
+    '{"id": 1}\n{"id": 2}\n',
+    '[“special”, ‘quotes’, 1 ]',
+    '{"a" @}',
+]
+
+
+def repair(text):
+    # the result of every kind of call, or the error
+    try:
+        offset_map = OffsetMap()
+        return (
+            fix_json(text),
+            fix_json(text, output_format='minified'),
+            fix_json(text, output_format={'indent': 2}, profile=['comments', 'special_quotes']),
+            fix_json(text, offset_map=offset_map),
+            list(offset_map),
+            fix_python_literal(text),
+            [value for _, _, value in iter_root_values(text)],
+        )
+    except JSONFixError as err:
+        return err.code, err.position, fix_json(text, recover=True)[0]
+
+
+class TestThreadSafety(unittest.TestCase):
+    def test_should_not_have_mutable_module_globals(self):
+        # mutable state shared by all threads would make fix_json non-reentrant
+        mutable_types = (dict, list, set, bytearray, array)
+        for module_info in pkgutil.iter_modules(json_fixer.__path__):
+            if module_info.name.endswith('_test'):
+                continue
+            module = importlib.import_module('json_fixer.' + module_info.name)
+            for name, value in vars(module).items():
+                if name.startswith('__') or value is compiled_pattern:
+                    # the cache of compiled_pattern is the only shared state, and it is thread-safe
+                    continue
+                self.assertNotIsInstance(value, mutable_types, f'{module.__name__}.{name}')
+                self.assertIsInstance(value, (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType,
+                                              types.MappingProxyType, str, bytes, int, float, tuple, frozenset),
+                                      f'{module.__name__}.{name}')
+
+    def test_should_repair_concurrently(self):
+        expected = [repair(text) for text in DOCUMENTS]
+        texts = DOCUMENTS * 50
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(repair, texts))
+        self.assertEqual(results, expected * 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,4 @@
-# Import the re module for regular expressions
-import re
+from functools import lru_cache
 
 # Constants analogous to the ones in stringUtils.ts
 codeBackslash = 0x5c  # "\\"
@@ -51,13 +50,23 @@ codeQuoteRight = 0x2019  # ’
 codeGraveAccent = 0x0060  # `
 codeAcuteAccent = 0x00b4  # ´
 
-regex_delimiter = re.compile(r'^[,:[\]{}()\n]$')
+# The character classes below are plain strings instead of compiled regular expressions,
+# so that importing the package does not pay for importing and compiling `re`
+delimiters = ',:[]{}()\n'
 
-# alpha, number, minus, or opening bracket or brace
-regex_start_of_value = re.compile(r'^[\[{\w-]$')
+# opening bracket or brace, minus or underscore: the rest of \w is covered by str.isalnum
+start_of_value_characters = '[{-_'
 
 
 # Utility Functions
+@lru_cache(maxsize=None)
+def compiled_pattern(pattern: str):
+    # Regular expressions are compiled on first use, to keep the import of the package cheap,
+    # and kept in this cache, which is safe to use from several threads
+    import re
+    return re.compile(pattern)
+
+
 def is_hex(code: int):
     return ((code >= codeZero and code <= codeNine) or
             (code >= codeUppercaseA and code <= codeUppercaseF) or
@@ -77,11 +86,12 @@ def is_valid_string_character(code: int):
 
 
 def is_delimiter(char: str):
-    return bool(regex_delimiter.match(char)) or (char and is_quote(ord(char[0])))
+    return len(char) == 1 and (char in delimiters or is_quote(ord(char)))
 
 
 def is_start_of_value(char: str):
-    return bool(regex_start_of_value.match(char)) or (char and is_quote(ord(char[0])))
+    # alpha, number, minus, or opening bracket or brace
+    return len(char) == 1 and (char in start_of_value_characters or char.isalnum() or is_quote(ord(char)))
 
 
 def is_control_character(code: int):
@@ -132,27 +142,14 @@ def is_single_quote_like(code: int):
     )
 
 
-def strip_last_occurrence(text: str, text_to_strip: str, strip_remaining_text: bool = False):
-    index = text.rfind(text_to_strip)
-    return text[:index] + (text[index + 1:] if not strip_remaining_text else '') if index != -1 else text
-
-
-def insert_before_last_whitespace(text: str, text_to_insert: str):
-    index = len(text)
-
-    if not is_whitespace(ord(text[index - 1])):
-        # no trailing whitespaces
-        return text + text_to_insert
-
-    while is_whitespace(ord(text[index - 1])) and index > 0:
-        index -= 1
-
-    return text[:index] + text_to_insert + text[index:]
-
-
-def remove_at_index(text: str, start: int, count: int):
-    return text[:start] + text[start + count:]
+def is_whitespace_chunk(chunk: str):
+    # a chunk of whitespace in a list of output chunks. Empty chunks are left behind by some repairs
+    return chunk == '' or chunk.isspace()
 
 
 def ends_with_comma_or_newline(text: str):
-    return bool(re.search(r'[,\n][ \t\r]*$', text))
+    # equivalent of re.search(r'[,\n][ \t\r]*$', text)
+    index = len(text) - 1
+    while index >= 0 and text[index] in ' \t\r':
+        index -= 1
+    return index >= 0 and text[index] in ',\n'